@@ -0,0 +1,33 @@
+"""
+Compare the throughput of ``concurrent_map`` on many trivial calls, with and without ``chunksize``::
+
+    python benchmarks/chunksize.py [count]
+"""
+
+import sys
+import logging
+
+from easypy import logging as easypy_logging
+if not issubclass(logging.Logger, easypy_logging.ContextLoggerMixin):
+    logging.Logger.__bases__ = logging.Logger.__bases__ + (easypy_logging.ContextLoggerMixin,)
+
+from easypy.concurrency import concurrent_map
+from easypy.timing import Timer
+
+
+def throughput(count, **kw):
+    timer = Timer()
+    assert concurrent_map(abs, range(count), workers=8, **kw) == list(range(count))
+    return count / timer.stop()
+
+
+def main(count=100000):
+    unchunked = throughput(count)
+    chunked = throughput(count, chunksize=1000)
+    print("%s trivial calls on 8 workers:" % count)
+    print("  unchunked:        %10.0f calls/s" % unchunked)
+    print("  chunksize=1000:   %10.0f calls/s (x%.1f)" % (chunked, chunked / unchunked))
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,5 @@
+import sys
+
+collect_ignore = []
+if sys.version_info < (3, 7):
+    collect_ignore.append("easypy/aio.py")  # uses the async/await syntax, and requires contextvars (for doctests)
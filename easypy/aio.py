@@ -0,0 +1,106 @@
+"""
+This module bridges ``MultiObject`` and ``concurrent_map`` into ``asyncio``, for running coroutines concurrently on
+the event loop rather than in threads::
+
+    statuses = await AsyncMultiObject(servers).get_status()
+
+Each coroutine runs in a task with a thread-context of its own (see ``easypy.threadtree.set_task_parent``),
+so logging contexts work as they do in threads.
+
+Requires python 3.7 (``contextvars``).
+"""
+
+import asyncio
+import inspect
+
+from easypy.concurrency import MultiObject, MultiException, Futures, _completed_future, _log_exception, _logger
+from easypy.concurrency import _get_func_name, _to_args_list, _to_log_contexts
+from easypy.threadtree import get_context_uuid, set_task_parent
+
+
+async def concurrent_map_async(func, params, workers=None, log_contexts=None, **kw):
+    """
+    Like ``concurrent_map``, for coroutine functions - map the list of tuple-parameters onto ``func``, running the
+    calls concurrently on the event loop, at most ``workers`` at a time (default: all of them), and returning
+    the list of results. Raises a ``MultiException`` if one or more of the calls failed.
+    """
+    params = _to_args_list(params)
+    log_contexts = list(_to_log_contexts(params, log_contexts))
+    semaphore = asyncio.Semaphore(workers or len(params) or 1)
+    parent_uuid = get_context_uuid()
+    funcname = _get_func_name(func)
+
+    async def run(args, ctx):
+        async with semaphore:
+            set_task_parent(parent_uuid)
+            with _logger.context(**ctx):
+                try:
+                    result = func(*args, **kw)
+                    if inspect.isawaitable(result):
+                        result = await result
+                    return result
+                except Exception as exc:
+                    _log_exception(exc, func)
+                    raise
+
+    tasks = [asyncio.ensure_future(run(args, ctx)) for args, ctx in zip(params, log_contexts)]
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    exceptions = [task.exception() for task in tasks]
+    if any(exceptions):
+        futures = Futures(
+            _completed_future(ctx, funcname, exc, None if exc else task.result())
+            for task, ctx, exc in zip(tasks, log_contexts, exceptions))
+        raise MultiException(exceptions=exceptions, futures=futures)
+    return [task.result() for task in tasks]
+
+
+class AsyncMultiObject(object):
+    """
+    A ``MultiObject`` for objects with coroutine methods. Calls return an awaitable of an ``AsyncMultiObject``
+    of their results, running concurrently on the event loop (see ``concurrent_map_async``)::
+
+        servers = AsyncMultiObject(servers, workers=100)
+        await servers.connect()
+        statuses = (await servers.session.get_status()).T
+
+    Attribute access is not concurrent, since it can't be awaited.
+    """
+
+    def __init__(self, items=None, log_ctx=None, workers=None):
+        self._multiobject = MultiObject(items, log_ctx=log_ctx, workers=workers)
+
+    def __repr__(self):
+        return "<%s (x%s/%s)>" % (self.__class__.__name__, len(self), self._multiobject._workers)
+
+    def _new(self, items):
+        mo = self._multiobject
+        return AsyncMultiObject(items, log_ctx=mo._log_ctx, workers=mo._workers)
+
+    @property
+    def L(self):
+        return self._multiobject.L
+
+    @property
+    def T(self):
+        return self._multiobject.T
+
+    def __iter__(self):
+        return iter(self._multiobject)
+
+    def __len__(self):
+        return len(self._multiobject)
+
+    def __getattr__(self, attr):
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return self._new([getattr(obj, attr) for obj in self])
+
+    def __call__(self, *args, **kwargs):
+        return self.call(lambda obj: obj(*args, **kwargs))
+
+    async def call(self, func, *args, **kw):
+        "Concurrently call a (coroutine) function on each of the objects contained by this ``AsyncMultiObject``"
+        mo = self._multiobject
+        params = [((item,) + args) for item in self] if args else self.T
+        return self._new(await concurrent_map_async(func, params, workers=mo._workers, log_contexts=mo._log_ctx, **kw))
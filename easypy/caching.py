@@ -1,13 +1,23 @@
 import os
 import sys
 import time
+import atexit
+import json
 import shelve
+import pickle
+import marshal
+import hashlib
+import sqlite3
+import asyncio
 import inspect
+import weakref
 from threading import RLock
 from logging import getLogger
-from collections import defaultdict
+from abc import ABCMeta, abstractmethod
+from collections import defaultdict, OrderedDict, namedtuple, deque
 from contextlib import ExitStack, contextmanager
 from functools import wraps, _make_key, partial, lru_cache, update_wrapper
+from itertools import islice
 
 from .decorations import parametrizeable_decorator, DecoratingDescriptor
 from .collections import ilistify
@@ -29,15 +39,529 @@ except:  # noqa
 
 
 DISABLE_CACHING_PERSISTENCE = yesno_to_bool(os.getenv("EASYPY_DISABLE_CACHING_PERSISTENCE", "no"))
+_INHERITED_HANDLES = []
 
 
-class PersistentCache(object):
+Codec = namedtuple("Codec", "dumps loads")
+
+# Serializers for the values stored in a ``PersistentCache``
+CODECS = dict(
+    pickle=Codec(partial(pickle.dumps, protocol=pickle.HIGHEST_PROTOCOL), pickle.loads),
+    marshal=Codec(marshal.dumps, marshal.loads),  # fast, but only for builtin types
+    json=Codec(lambda value: json.dumps(value).encode("utf8"), lambda data: json.loads(data.decode("utf8"))),
+)
+
+try:
+    import msgpack
+except ImportError:
+    pass
+else:
+    CODECS['msgpack'] = Codec(partial(msgpack.packb, use_bin_type=True), partial(msgpack.unpackb, raw=False))
+
+
+CacheInfo = namedtuple("CacheInfo", "name hits misses expirations evictions currsize compute_time lock_wait_time")
+
+_CACHES = weakref.WeakSet()
+
+
+def iter_caches():
+    "Iterate over all the live caches in this process (``timecache``, ``locking_cache``, ``cached_property``, ``PersistentCache``)"
+    return iter(list(_CACHES))
+
+
+def get_caches_info():
+    "Return a list of the ``CacheInfo`` statistics of all the live caches in this process"
+    return [cache.cache_info() for cache in iter_caches()]
+
+
+class _CacheStats(object):
+    """
+    A mixin for collecting statistics on our caches, and registering them for ``iter_caches``.
+    The counters are updated without locking, so they may be slightly off under heavy contention.
+    """
+
+    def _init_stats(self):
+        self.cache_info_clear()
+        _CACHES.add(self)
+
+    def cache_info_clear(self):
+        "Reset the statistics of this cache"
+        self._hits = self._misses = self._expirations = self._evictions = 0
+        self._compute_time = self._lock_wait_time = 0.0
+
+    def _cache_name(self):
+        return repr(self)
+
+    def _cache_size(self):
+        return None
+
+    def cache_info(self):
+        "Return the ``CacheInfo`` statistics of this cache"
+        return CacheInfo(
+            name=self._cache_name(), hits=self._hits, misses=self._misses, expirations=self._expirations,
+            evictions=self._evictions, currsize=self._cache_size(), compute_time=self._compute_time,
+            lock_wait_time=self._lock_wait_time)
+
+
+class PersistentCacheBackend(metaclass=ABCMeta):
+    """
+    Base class for the storage behind a ``PersistentCache``.
+
+    Entries are stored as ``(payload, timestamp, expires)``, where ``payload`` is the serialized value (``bytes``),
+    and ``expires`` is an absolute time, or ``None`` if the entry does not expire.
+    Keeping the timestamps apart from the payload allows checking expiration without deserializing the value.
+
+    :param path: location of the cache file(s).
+    :param keep_open: keep the storage open for the lifetime of the process, instead of opening it on every access.
+    """
+
+    def __init__(self, path, keep_open=False):
+        self.path = path
+        self.keep_open = keep_open
+        self.lock = RLock()
+
+    @abstractmethod
+    def get(self, key, touch=False):
+        """
+        Return the ``(payload, timestamp, expires)`` entry of ``key``, or raise ``KeyError``.
+        If ``touch`` is set, record the access for the sake of LRU eviction (see ``evict``).
+        """
+
+    @abstractmethod
+    def set(self, key, payload, timestamp, expires):
+        "Store an entry"
+
+    @abstractmethod
+    def delete(self, key):
+        "Remove an entry, if it exists"
+
+    @abstractmethod
+    def clear(self):
+        "Remove all entries"
+
+    @abstractmethod
+    def purge_expired(self, now):
+        "Remove all entries that expire at ``now`` or earlier, and return their number"
+
+    @abstractmethod
+    def evict(self, max_entries=None, max_bytes=None):
+        "Remove the least recently used entries until within the given limits, and return their number"
+
+    def vacuum(self):
+        "Compact the storage, reclaiming the space of removed entries"
+
+    def count(self):
+        "Return the number of entries in the storage, or ``None`` if unknown"
+        return None
+
+    def close(self):
+        "Close the storage, if it is kept open"
+
+
+class ShelveBackend(PersistentCacheBackend):
+    """
+    Stores the cache in a ``shelve`` file.
+    The shelve cannot be opened by several processes at once, so use ``SQLiteBackend`` for caches shared by processes.
+
+    Note that some dbm implementations (gdbm) lock the file while it is open, so use ``keep_open`` only when
+    a single process uses the cache at a time.
+
+    Reading an entry does not modify the shelve, so eviction here removes the least recently *written* entries.
+    Each entry has a small metadata record (its timestamp, expiration and size) under ``META_PREFIX + key``,
+    so that eviction and purging don't need to read the payloads.
+    """
+
+    META_PREFIX = "\x00meta:"
+
+    def __init__(self, path, keep_open=False):
+        super().__init__(path, keep_open=keep_open)
+        self._db = None
+        self._db_pid = None
+
+    def _open_db(self):
+        from .resilience import retrying
+        try:
+            return retrying(3, acceptable=GDBMException, sleep=5)(shelve.open)(self.path)
+        except Exception:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+            try:
+                return shelve.open(self.path)
+            except Exception:
+                _logger.warning("Could not open PersistentCache: %s", self.path)
+                return {}
+
+    def close(self):
+        with self.lock:
+            db, self._db = self._db, None
+            if db is not None and type(db) is not dict and self._db_pid == os.getpid():
+                db.close()
+
+    @contextmanager
+    def db_opened(self, lock=False):
+        if DISABLE_CACHING_PERSISTENCE:
+            yield {}
+            return
+
+        if self.keep_open:
+            # a kept-open shelve is shared between threads, so we always lock it
+            with self.lock:
+                if self._db is None or self._db_pid != os.getpid():
+                    if self._db is not None:
+                        # a shelve inherited from our parent process still belongs to the parent, so we must not
+                        # close it, and must not let the GC close it either
+                        _INHERITED_HANDLES.append(self._db)
+                    first_open = self._db_pid is None
+                    self._db = self._open_db()
+                    self._db_pid = os.getpid()
+                    if first_open:
+                        atexit.register(self.close)
+                yield self._db
+            return
+
+        with self.lock:
+            db = self._open_db()
+
+        with ExitStack() as stack:
+            if lock:
+                stack.enter_context(self.lock)
+            yield db
+
+        if type(db) is not dict:
+            db.close()
+
+    @staticmethod
+    def _is_current(entry):
+        # entries written by older versions stored the value itself, and are ignored
+        return len(entry) == 3 and isinstance(entry[2], bytes)
+
+    def get(self, key, touch=False):
+        with self.db_opened() as db:
+            entry = db[key]
+        if not self._is_current(entry):
+            raise KeyError(key)
+        timestamp, expires, payload = entry
+        return payload, timestamp, expires
+
+    def set(self, key, payload, timestamp, expires):
+        with self.db_opened(lock=True) as db:
+            db[key] = (timestamp, expires, payload)
+            db[self.META_PREFIX + key] = (timestamp, expires, len(payload))
+
+    def delete(self, key):
+        with self.db_opened(lock=True) as db:
+            db.pop(key, None)
+            db.pop(self.META_PREFIX + key, None)
+
+    def _read_metadata(self, db):
+        "Return ``{key: (timestamp, expires, size)}`` of the entries, with ``None`` for entries that have no metadata"
+        keys = list(db.keys())
+        metadata = {key: None for key in keys if not key.startswith(self.META_PREFIX)}
+        for meta_key in keys:
+            if meta_key.startswith(self.META_PREFIX):
+                key = meta_key[len(self.META_PREFIX):]
+                if key in metadata:
+                    metadata[key] = db[meta_key]
+                else:
+                    del db[meta_key]  # left behind by an interrupted write
+        return metadata
+
+    def _remove(self, db, keys):
+        for key in keys:
+            del db[key]
+            db.pop(self.META_PREFIX + key, None)
+
+    def clear(self):
+        with self.db_opened() as db:
+            db.clear()
+
+    def purge_expired(self, now):
+        with self.db_opened(lock=True) as db:
+            # entries without metadata were written by older versions, and are purged too
+            expired = [key for key, meta in self._read_metadata(db).items()
+                       if meta is None or (meta[1] is not None and meta[1] <= now)]
+            self._remove(db, expired)
+        return len(expired)
+
+    def evict(self, max_entries=None, max_bytes=None):
+        with self.db_opened(lock=True) as db:
+            if type(db) is dict:
+                return 0
+            entries = [(meta[0], meta[2], key) if meta else (0, 0, key)  # evict entries without metadata first
+                       for key, meta in self._read_metadata(db).items()]
+            evicted = _select_evicted(sorted(entries), max_entries, max_bytes)
+            self._remove(db, evicted)
+        return len(evicted)
+
+    def vacuum(self):
+        with self.db_opened(lock=True) as db:
+            reorganize = getattr(getattr(db, "dict", None), "reorganize", None)
+            if reorganize:
+                reorganize()  # gdbm
+
+    def count(self):
+        with self.db_opened() as db:
+            return sum(not key.startswith(self.META_PREFIX) for key in db.keys())
+
+
+class SQLiteBackend(PersistentCacheBackend):
+    """
+    Stores the cache in an SQLite database (at ``<path>.sqlite``) in WAL mode, which allows several processes
+    to read and write the same cache concurrently.
+    The connection is always kept open, and is reopened in forked child processes.
+    The accesses recorded by ``get(touch=True)`` are written in batches (every ``TOUCH_BATCH_SIZE`` reads or
+    ``TOUCH_BATCH_INTERVAL`` seconds, and before evicting), rather than with an ``UPDATE`` on every read.
+
+    :param timeout: how long to wait for another process' write to complete, in seconds.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS cache "
+        "(key TEXT PRIMARY KEY, value BLOB NOT NULL, timestamp REAL NOT NULL, expires REAL)",
+        "CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires)",
+    )
+    COLUMNS_ADDED = (
+        ("size", "INTEGER NOT NULL DEFAULT 0"),
+        ("accessed", "REAL NOT NULL DEFAULT 0"),
+    )
+    INDEXES_ADDED = (
+        "CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)",
+    )
+    TOUCH_BATCH_SIZE = 100
+    TOUCH_BATCH_INTERVAL = 10
+
+    def __init__(self, path, keep_open=True, timeout=30):
+        super().__init__(path, keep_open=True)
+        self.db_path = "%s.sqlite" % path
+        self.timeout = timeout
+        self._conn = None
+        self._conn_pid = None
+        self._touched = {}  # key -> access time, not written yet
+        self._touches_written = time.time()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in self.SCHEMA:
+            conn.execute(statement)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(cache)")}
+        for column, definition in self.COLUMNS_ADDED:
+            if column not in columns:
+                conn.execute("ALTER TABLE cache ADD COLUMN %s %s" % (column, definition))
+        for statement in self.INDEXES_ADDED:
+            conn.execute(statement)
+        return conn
+
+    def close(self):
+        with self.lock:
+            conn, self._conn = self._conn, None
+            if conn is not None and self._conn_pid == os.getpid():
+                with self._handling_errors("write to"):
+                    self._write_touches(conn)
+                conn.close()
+
+    @contextmanager
+    def db_opened(self):
+        # the connection is shared between threads, so we always lock it
+        with self.lock:
+            if self._conn is None or self._conn_pid != os.getpid():
+                if self._conn is not None:
+                    # a connection inherited from our parent process must not be used (or closed) by the child
+                    _INHERITED_HANDLES.append(self._conn)
+                first_open = self._conn_pid is None
+                try:
+                    self._conn = self._connect()
+                except sqlite3.OperationalError:
+                    raise  # most likely locked by another process - don't touch the file
+                except sqlite3.DatabaseError as exc:
+                    _logger.warning("PersistentCache is corrupted, recreating it (%s): %s", exc, self.db_path)
+                    for suffix in ("", "-wal", "-shm"):
+                        try:
+                            os.unlink(self.db_path + suffix)
+                        except FileNotFoundError:
+                            pass
+                    self._conn = self._connect()
+                self._conn_pid = os.getpid()
+                if first_open:
+                    atexit.register(self.close)
+            yield self._conn
+
+    @contextmanager
+    def _handling_errors(self, action):
+        try:
+            yield
+        except sqlite3.OperationalError as exc:
+            # the cache is an optimization, so we'd rather not fail the call
+            _logger.warning("Could not %s PersistentCache (%s): %s", action, exc, self.db_path)
+
+    def get(self, key, touch=False):
+        if DISABLE_CACHING_PERSISTENCE:
+            raise KeyError(key)
+        row = None
+        with self._handling_errors("read from"), self.db_opened() as conn:
+            row = conn.execute("SELECT value, timestamp, expires FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is not None and touch:
+                now = time.time()
+                self._touched[key] = now
+                if (len(self._touched) >= self.TOUCH_BATCH_SIZE or
+                        now - self._touches_written >= self.TOUCH_BATCH_INTERVAL):
+                    self._write_touches(conn)
+        if row is None:
+            raise KeyError(key)
+        payload, timestamp, expires = row
+        return bytes(payload), timestamp, expires
+
+    def _write_touches(self, conn):
+        # must be called while holding the lock
+        touched, self._touched = self._touched, {}
+        self._touches_written = time.time()
+        if not touched:
+            return
+        conn.execute("BEGIN")
+        try:
+            conn.executemany("UPDATE cache SET accessed = ? WHERE key = ?", ((ts, key) for key, ts in touched.items()))
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def set(self, key, payload, timestamp, expires):
+        if DISABLE_CACHING_PERSISTENCE:
+            return
+        with self._handling_errors("write to"), self.db_opened() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, timestamp, expires, size, accessed) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, sqlite3.Binary(payload), timestamp, expires, len(payload), timestamp))
+
+    def delete(self, key):
+        if DISABLE_CACHING_PERSISTENCE:
+            return
+        with self._handling_errors("write to"), self.db_opened() as conn:
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self):
+        if DISABLE_CACHING_PERSISTENCE:
+            return
+        with self._handling_errors("clear"), self.db_opened() as conn:
+            conn.execute("DELETE FROM cache")
+
+    def purge_expired(self, now):
+        if DISABLE_CACHING_PERSISTENCE:
+            return 0
+        with self._handling_errors("purge"), self.db_opened() as conn:
+            return conn.execute("DELETE FROM cache WHERE expires <= ?", (now,)).rowcount
+        return 0
+
+    def evict(self, max_entries=None, max_bytes=None):
+        if DISABLE_CACHING_PERSISTENCE:
+            return 0
+        with self._handling_errors("evict from"), self.db_opened() as conn:
+            self._write_touches(conn)
+            # an immediate transaction, so that processes evicting concurrently don't over-evict
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                count, total = conn.execute("SELECT count(*), total(size) FROM cache").fetchone()
+                if (max_entries is None or count <= max_entries) and (max_bytes is None or total <= max_bytes):
+                    evicted = []
+                else:
+                    entries = conn.execute("SELECT accessed, size, key FROM cache ORDER BY accessed").fetchall()
+                    evicted = _select_evicted(entries, max_entries, max_bytes, count=count, total=total)
+                    conn.executemany("DELETE FROM cache WHERE key = ?", ((key,) for key in evicted))
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return len(evicted)
+        return 0
+
+    def vacuum(self):
+        if DISABLE_CACHING_PERSISTENCE:
+            return
+        with self._handling_errors("vacuum"), self.db_opened() as conn:
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def count(self):
+        if DISABLE_CACHING_PERSISTENCE:
+            return 0
+        with self._handling_errors("count"), self.db_opened() as conn:
+            return conn.execute("SELECT count(*) FROM cache").fetchone()[0]
+
+
+def _select_evicted(entries, max_entries, max_bytes, count=None, total=None):
+    """
+    Select the keys to evict from ``(accessed, size, key)`` entries, ordered from the least recently used,
+    so that the remaining entries are within ``max_entries`` and ``max_bytes``.
+    """
+    if count is None:
+        entries = list(entries)
+        count = len(entries)
+        total = sum(size for _, size, _ in entries)
+    evicted = []
+    for _, size, key in entries:
+        if (max_entries is None or count <= max_entries) and (max_bytes is None or total <= max_bytes):
+            break
+        evicted.append(key)
+        count -= 1
+        total -= size
+    return evicted
+
+
+PERSISTENT_CACHE_BACKENDS = dict(shelve=ShelveBackend, sqlite=SQLiteBackend)
+
+
+def _encode_key(obj):
+    """
+    Encode ``obj`` for hashing into a persistent key, such that equal objects have the same encoding - regardless of
+    the order of sets and dicts (which depends on ``PYTHONHASHSEED``), and of whether equal members are the same object
+    (which changes the output of ``pickle``). Other types are pickled (with a fixed protocol, so keys remain stable
+    across python versions), or ``repr``-ed if they cannot be pickled.
+    """
+    kind = type(obj)
+    if kind in (str, bytes, int, float, bool, type(None)):
+        return repr(obj).encode("utf8")
+    if kind in (tuple, list):
+        members = [_encode_key(member) for member in obj]
+    elif kind in (set, frozenset):
+        kind = set  # they compare equal
+        members = sorted(_encode_key(member) for member in obj)
+    elif kind is dict:
+        members = sorted(_encode_key(k) + b":" + _encode_key(v) for k, v in obj.items())
+    else:
+        try:
+            data = pickle.dumps(obj, protocol=4)
+        except Exception:
+            data = repr(obj).encode("utf8")
+        return b"pickle" + str(len(data)).encode() + b":" + data
+    return kind.__name__.encode() + b"(" + b",".join(members) + b")"
+
+
+class PersistentCache(_CacheStats):
     """
     A memoizer that stores its cache persistantly using shelve.
 
     :param path: location of cache shelve file.
     :param version: modify to deprecate old cahed data
     :param expiration: expiration in seconds for the entire cache. ``None`` to disable expiration.
+    :param keep_open: keep the shelve open for the lifetime of the process, instead of opening it on every access.
+                      The shelve is reopened in forked child processes. Note that some dbm implementations (gdbm)
+                      lock the file while it is open, so use this only when a single process uses the cache at a time.
+    :param backend: the storage to use - ``'shelve'`` (default), ``'sqlite'`` (for caches shared by several processes),
+                    or a ``PersistentCacheBackend`` subclass.
+    :param max_entries: evict the least recently used entries beyond this number of entries (with the ``'shelve'``
+                        backend, the least recently written).
+    :param max_bytes: evict the least recently used entries beyond this total size of (serialized) values (with the
+                      ``'shelve'`` backend, the least recently written).
+    :param codec: how to serialize values - ``'pickle'`` (default), ``'marshal'`` (builtin types only), ``'json'``,
+                  ``'msgpack'`` (if installed), or a ``Codec`` object.
+    :param hashed_keys: store entries under a hash of the function and its arguments, instead of their ``str()``.
+                        This is cheaper and more compact, but the arguments must be picklable (or have a stable ``repr``).
+
+    The ``max_entries`` and ``max_bytes`` limits are enforced every ``EVICTION_INTERVAL`` writes of this process,
+    and on ``vacuum()``, so the storage may temporarily exceed them.
 
     Example::
 
@@ -49,80 +573,124 @@ class PersistentCache(object):
         ...     while a < n:
         ...         a, b = b, a+b
         ...     return a
+
+    A per-function expiration can be set with ``ttl``::
+
+        >>> @CACHE(ttl=10)
+        ... def get_status():
+        ...     return "OK"
     """
 
-    def __init__(self, path, version=None, expiration=4 * HOUR, ignored_keywords=None):
+    EVICTION_INTERVAL = 32
+
+    def __init__(self, path, version=None, expiration=4 * HOUR, ignored_keywords=None, keep_open=False, backend='shelve',
+                 max_entries=None, max_bytes=None, codec='pickle', hashed_keys=False):
         self.path = path
         self.version = version
         if version is not None:
             self.path = "{self.path}.v{version}".format(**locals())
         self.expiration = expiration
-        self.lock = RLock()
         self.ignored_keywords = set(ilistify(ignored_keywords)) if ignored_keywords else set()
+        backend_type = PERSISTENT_CACHE_BACKENDS[backend] if isinstance(backend, str) else backend
+        self.backend = backend_type(self.path, keep_open=keep_open)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bounded = max_entries is not None or max_bytes is not None
+        self._writes = 0
+        self.codec = CODECS[codec] if isinstance(codec, str) else codec
+        self.hashed_keys = hashed_keys
+        self._init_stats()
+
+    def _cache_name(self):
+        return self.path
+
+    def _cache_size(self):
+        return self.backend.count()
+
+    def close(self):
+        "Close the cache's storage, if it was kept open (see ``keep_open``)"
+        self.backend.close()
+
+    def set(self, key, value, ttl=None):
+        """
+        Store a value in the cache.
 
-    @contextmanager
-    def db_opened(self, lock=False):
-        if DISABLE_CACHING_PERSISTENCE:
-            yield {}
+        :param ttl: expiration in seconds for this entry, instead of the cache's ``expiration``.
+        """
+        if value == DELETED:
+            self.backend.delete(key)
             return
+        now = time.time()
+        if ttl is None:
+            ttl = self.expiration
+        self.backend.set(key, self.codec.dumps(value), now, now + ttl if ttl else None)
 
-        from .resilience import retrying
-        with self.lock:
-            try:
-                db = retrying(3, acceptable=GDBMException, sleep=5)(shelve.open)(self.path)
-            except Exception:
-                try:
-                    os.unlink(self.path)
-                except FileNotFoundError:
-                    pass
-                try:
-                    db = shelve.open(self.path)
-                except Exception:
-                    _logger.warning("Could not open PersistentCache: %s", self.path)
-                    db = {}
-
-        with ExitStack() as stack:
-            if lock:
-                stack.enter_context(self.lock)
-            yield db
-
-        if type(db) is not dict:
-            db.close()
-
-    def set(self, key, value):
-        with self.db_opened(lock=True) as db:
-            if value == DELETED:
-                del db[key]
-            else:
-                db[key] = (value, time.time())
+        if self.bounded:
+            self._writes += 1
+            if self._writes >= self.EVICTION_INTERVAL:
+                self._writes = 0
+                self.evict()
 
     def get(self, key, default=NO_DEFAULT):
         try:
-            with self.db_opened() as db:
-                value, timestamp = db[key]
-            if not self.expiration:
-                pass
-            elif (timestamp + self.expiration) <= time.time():
+            try:
+                payload, timestamp, expires = self.backend.get(key, touch=self.bounded)
+            except KeyError:
+                self._misses += 1
+                raise
+            if expires is not None and expires <= time.time():
+                self._misses += 1
+                self._expirations += 1
                 raise KeyError()
-            return value
+            self._hits += 1
+            return self.codec.loads(payload)
         except KeyError:
             if default is NO_DEFAULT:
                 raise
             else:
                 return default
 
-    def __call__(self, func=None, *, validator=None):
-        if validator and not func:
-            return partial(self.__call__, validator=validator)
+    def purge_expired(self):
+        "Remove all expired entries from the cache's storage, returning their number"
+        return self.backend.purge_expired(time.time())
+
+    def evict(self):
+        "Evict the least recently used entries beyond ``max_entries`` and ``max_bytes``, returning their number"
+        if not self.bounded:
+            return 0
+        evicted = self.backend.evict(max_entries=self.max_entries, max_bytes=self.max_bytes)
+        self._evictions += evicted
+        return evicted
+
+    def vacuum(self):
+        """
+        Remove expired entries, evict entries beyond the cache's limits, and compact the storage.
+        Returns the number of entries removed.
+        """
+        removed = self.purge_expired() + self.evict()
+        self.backend.vacuum()
+        return removed
+
+    def make_key(self, func, args, kwargs):
+        "Create the storage key for calling ``func`` with the given arguments"
+        key_kwargs = {k: v for k, v in kwargs.items() if k not in self.ignored_keywords}
+        if not self.hashed_keys:
+            return str(_make_key(
+                (func.__module__, func.__qualname__,) + args, key_kwargs,
+                typed=False, kwd_mark=("_KWD_MARK_",)))
+
+        key = (func.__module__, func.__qualname__, args, key_kwargs)
+        return hashlib.sha1(_encode_key(key)).hexdigest()
+
+    def __call__(self, func=None, *, validator=None, ttl=None):
+        if not func:
+            return partial(self.__call__, validator=validator, ttl=ttl)
 
         validator = validator and kwargs_resilient(validator)
 
         @wraps(func)
         def inner(*args, **kwargs):
-            key_kwargs = {k: v for k, v in kwargs.items() if k not in self.ignored_keywords}
-            key = str(_make_key(
-                (func.__module__, func.__qualname__,) + args, key_kwargs,
-                typed=False, kwd_mark=("_KWD_MARK_",)))
+            key = self.make_key(func, args, kwargs)
 
             try:
                 value = self.get(key)
@@ -133,19 +701,22 @@ class PersistentCache(object):
                     return value
                 validated_value = validator(value, args=args, kwargs=kwargs)
                 if validated_value:
-                    self.set(key, validated_value)
+                    self.set(key, validated_value, ttl=ttl)
                     return validated_value
                 self.set(key, DELETED)
                 return inner(*args, **kwargs)
-            ret = func(*args, **kwargs)
-            self.set(key, ret)
+            t0 = time.perf_counter()
+            try:
+                ret = func(*args, **kwargs)
+            finally:
+                self._compute_time += time.perf_counter() - t0
+            self.set(key, ret, ttl=ttl)
             return ret
         inner.clear_cache = self.clear
         return inner
 
     def clear(self):
-        with self.db_opened() as db:
-            db.clear()
+        self.backend.clear()
 
 
 @deprecated(message="Please use easypy.caching.locking_cache")
@@ -216,7 +787,139 @@ else:
         bound_arguments.apply_defaults()
 
 
-class _TimeCache(DecoratingDescriptor):
+def _compile_key_builder(func, key_func=None, ignored_keywords=None):
+    """
+    Build a ``make_key(args, kwargs)`` function, that maps the arguments of ``func`` to a cache key, either by
+    calling ``key_func`` with the (bound) arguments it accepts, or by taking the arguments not in ``ignored_keywords``.
+
+    The signature is analyzed once, here, so that for plain signatures (no positional-only or variadic parameters)
+    a key is built without ``Signature.bind``. Anything out of the ordinary (including invalid calls) falls back to
+    ``Signature.bind``, so the semantics (and errors) remain the same.
+    """
+
+    sig = inspect.signature(func)
+    if key_func:
+        key_func = kwargs_resilient(key_func)
+
+        def key_from_arguments(arguments):
+            return key_func(**arguments)
+    else:
+        def key_from_arguments(arguments):
+            return tuple(v for k, v in sorted(arguments.items()) if k not in ignored_keywords)
+
+    def make_key_slow(args, kwargs):
+        bound = sig.bind(*args, **kwargs)
+        _apply_defaults(bound)
+        return key_from_arguments(bound.arguments)
+
+    params = sig.parameters.values()
+    if any(p.kind not in (p.POSITIONAL_OR_KEYWORD, p.KEYWORD_ONLY) for p in params):
+        return make_key_slow
+
+    names = tuple(p.name for p in params if p.kind is p.POSITIONAL_OR_KEYWORD)
+    all_names = frozenset(sig.parameters)
+    defaults = tuple((p.name, p.default) for p in params if p.default is not p.empty)
+    if ignored_keywords:
+        key_names = tuple(sorted(all_names - ignored_keywords))
+
+        def key_from_all_arguments(arguments):
+            return tuple(arguments[k] for k in key_names)
+    else:
+        def key_from_all_arguments(arguments):
+            # in signature order, as ``Signature.bind`` gives them, since ``key_func`` may depend on the order
+            return key_from_arguments({k: arguments[k] for k in sig.parameters})
+
+    def make_key(args, kwargs):
+        if len(args) > len(names):
+            return make_key_slow(args, kwargs)
+        arguments = dict(zip(names, args))
+        if kwargs:
+            if not all_names.issuperset(kwargs) or not arguments.keys().isdisjoint(kwargs):
+                return make_key_slow(args, kwargs)
+            arguments.update(kwargs)
+        if len(arguments) < len(all_names):
+            for name, default in defaults:
+                arguments.setdefault(name, default)
+            if len(arguments) < len(all_names):
+                return make_key_slow(args, kwargs)  # missing arguments
+        return key_from_all_arguments(arguments)
+
+    return make_key
+
+
+class _UseCounts(object):
+    """
+    The use counts of the keys of a cache, for its 'lfu' policy. The keys are kept in buckets by their count, each
+    ordered by recency of use, so the least frequently used key (with ties broken by the least recently used) is found
+    in O(1) rather than by scanning the cache.
+
+    Must be used under the cache's lock, except for ``touch``, which only queues the use. The queued uses are applied
+    on the next ``add`` or ``find_least_used``, and the oldest are dropped if more than ``MAX_PENDING_TOUCHES`` pile up,
+    so the counts are approximate when hits outpace writes.
+    """
+
+    MAX_PENDING_TOUCHES = 10000
+
+    def __init__(self):
+        self.counts = {}  # key -> use count
+        self.buckets = defaultdict(OrderedDict)  # use count -> keys with that count, least recently used first
+        self.min_count = 0
+        self.touches = deque(maxlen=self.MAX_PENDING_TOUCHES)
+
+    def __len__(self):
+        return len(self.counts)
+
+    def touch(self, key):
+        self.touches.append(key)  # lock-free, since appending to a deque is atomic
+
+    def add(self, key):
+        "Count a use of ``key``, adding it if needed"
+        self._apply_touches()
+        self._increment(key)
+
+    def discard(self, key):
+        count = self.counts.pop(key, None)
+        if count is not None:
+            self._remove_from_bucket(key, count)
+
+    def find_least_used(self, exclude, default=None):
+        self._apply_touches()
+        if self.min_count not in self.buckets and self.buckets:
+            self.min_count = min(self.buckets)  # the least used keys were discarded
+        for key in islice(self.buckets.get(self.min_count, ()), 2):
+            if key != exclude:
+                return key
+        for count in sorted(self.buckets):  # rare - only ``exclude`` has the lowest count
+            for key in islice(self.buckets[count], 2):
+                if key != exclude:
+                    return key
+        return default
+
+    def _apply_touches(self):
+        while self.touches:
+            key = self.touches.popleft()
+            if key in self.counts:  # and was not evicted in the meantime
+                self._increment(key)
+
+    def _increment(self, key):
+        count = self.counts.get(key, 0)
+        if count:
+            self._remove_from_bucket(key, count)
+            if count == self.min_count and count not in self.buckets:
+                self.min_count = count + 1
+        else:
+            self.min_count = 1
+        self.counts[key] = count + 1
+        self.buckets[count + 1][key] = None
+
+    def _remove_from_bucket(self, key, count):
+        bucket = self.buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[count]
+
+
+class _TimeCache(DecoratingDescriptor, _CacheStats):
     def __init__(self, func, **kwargs):
         update_wrapper(self, func)  # this needs to be first to avoid overriding attributes we set
         super().__init__(func=func, cached=True)
@@ -228,76 +931,282 @@ class _TimeCache(DecoratingDescriptor):
         self.log_recalculation = kwargs['log_recalculation']
         self.ignored_keywords = kwargs['ignored_keywords']
 
+        key_func = kwargs['key_func']
         if self.ignored_keywords:
-            assert not kwargs['key_func'], "can't specify both `ignored_keywords` AND `key_func`"
+            assert not key_func, "can't specify both `ignored_keywords` AND `key_func`"
             self.ignored_keywords = set(ilistify(self.ignored_keywords))
 
-            def key_func(**kw):
-                return tuple(v for k, v in sorted(kw.items()) if k not in self.ignored_keywords)
-        else:
-            key_func = kwargs['key_func']
+        self.stale_while_revalidate = kwargs['stale_while_revalidate']
+        self.refresh_ahead = kwargs['refresh_ahead']
+        if self.stale_while_revalidate or self.refresh_ahead:
+            assert self.expiration > 0, "background refresh requires an `expiration`"
+        assert not self.refresh_ahead or 0 < self.refresh_ahead < 1, "refresh_ahead must be a ratio between 0 and 1"
+        self.maxsize = kwargs['maxsize']
+        assert self.maxsize is None or self.maxsize > 0, "maxsize must be positive, or None (got %r)" % (self.maxsize,)
+        self.policy = kwargs['policy']
+        assert self.policy in ('lru', 'lfu'), "policy must be either 'lru' or 'lfu' (got %r)" % (self.policy,)
 
         self.NOT_FOUND = object()
         self.NOT_CACHED = self.NOT_FOUND, 0
 
-        self.cache = {}
+        self.cache = OrderedDict()  # ordered by recency of use, for the 'lru' policy
+        self.use_counts = _UseCounts()  # for the 'lfu' policy
+        self.next_sweep = 0
+        self.refreshing = set()
         self.main_lock = RLock()
         self.keyed_locks = defaultdict(RLock)
+        lock_stripes = kwargs['lock_stripes']
+        self.lock_stripes = tuple(RLock() for _ in range(lock_stripes)) if lock_stripes else None
 
-        if key_func:
-            sig = inspect.signature(func)
-
-            def make_key(args, kwargs):
-                bound = sig.bind(*args, **kwargs)
-                _apply_defaults(bound)
-                return kwargs_resilient(key_func)(**bound.arguments)
+        if key_func or self.ignored_keywords:
+            self.make_key = _compile_key_builder(func, key_func=key_func, ignored_keywords=self.ignored_keywords)
         else:
             def make_key(args, kwargs):
                 return _make_key(args, kwargs, typed=self.typed)
+            self.make_key = make_key
+        self._init_stats()
+
+    def _cache_name(self):
+        return self.__qualname__
+
+    def _cache_size(self):
+        return len(self.cache)
 
-        self.make_key = make_key
+    def _is_expired(self, ts):
+        return self.expiration > 0 and self.get_ts_func() - ts >= self.expiration
+
+    def _get_key_lock(self, key):
+        if self.lock_stripes:
+            return self.lock_stripes[hash(key) % len(self.lock_stripes)]
+        key_lock = self.keyed_locks.get(key)
+        if key_lock is None:
+            with self.main_lock:
+                key_lock = self.keyed_locks[key]
+        return key_lock
+
+    def _lookup(self, key, args, kwargs):
+        """
+        Return the cached value if it can be used, or ``NOT_FOUND``. Takes no lock.
+        Triggers a background refresh for stale values (``stale_while_revalidate``) and aging ones (``refresh_ahead``).
+        """
+        result, ts = self.cache.get(key, self.NOT_CACHED)
+        if result is self.NOT_FOUND:
+            return result
+        if self.expiration > 0:
+            age = self.get_ts_func() - ts
+            if age < self.expiration:
+                if self.refresh_ahead and age >= self.expiration * self.refresh_ahead:
+                    self._refresh_in_background(key, args, kwargs)
+            elif age < self.expiration + (self.stale_while_revalidate or 0):
+                # serve the stale value while it is being refreshed
+                self._refresh_in_background(key, args, kwargs)
+            else:
+                return self.NOT_FOUND
+        if self.maxsize:
+            self._touch(key)
+        self._hits += 1
+        return result
+
+    def _calculate(self, args, kwargs):
+        self._misses += 1
+        if self.log_recalculation:
+            _logger.debug('time cache expired, calculating new value for %s', self.__name__)
+        t0 = time.perf_counter()
+        try:
+            return self.func(*args, **kwargs)
+        finally:
+            self._compute_time += time.perf_counter() - t0
 
     def __call__(self, *args, **kwargs):
         key = self.make_key(args, kwargs)
 
-        with self.main_lock:
-            key_lock = self.keyed_locks[key]
+        # fast path - populated and unexpired entries are returned without taking any lock
+        result = self._lookup(key, args, kwargs)
+        if result is not self.NOT_FOUND:
+            return result
+
+        key_lock = self._get_key_lock(key)
+        t0 = time.perf_counter()
         with key_lock:
+            self._lock_wait_time += time.perf_counter() - t0
+
+            # check again, now that we hold the key's lock - another thread might have just calculated it
             result, ts = self.cache.get(key, self.NOT_CACHED)
 
-            if self.expiration <= 0:
-                pass  # nothing to fuss with, cache does not expire
-            elif result is self.NOT_FOUND:
+            if result is self.NOT_FOUND:
                 pass  # cache is empty
-            elif self.get_ts_func() - ts >= self.expiration:
+            elif self._is_expired(ts):
                 # cache expired
                 result = self.NOT_FOUND
-                del self.cache[key]
+                self._expirations += 1
+                with self.main_lock:
+                    self.cache.pop(key, None)
+                    self.use_counts.discard(key)
 
             if result is self.NOT_FOUND:
-                if self.log_recalculation:
-                    _logger.debug('time cache expired, calculating new value for %s', self.__name__)
-                result = self.func(*args, **kwargs)
-                self.cache[key] = result, self.get_ts_func()
+                try:
+                    result = self._calculate(args, kwargs)
+                except BaseException:
+                    if not self.lock_stripes:
+                        with self.main_lock:
+                            if key not in self.cache:
+                                # or it would be left behind, since only the locks of cached keys are dropped
+                                self.keyed_locks.pop(key, None)
+                    raise
+                self._store(key, result)
+            else:
+                self._hits += 1
+                if self.maxsize:
+                    self._touch(key)
 
             return result
 
+    def _refresh_in_background(self, key, args, kwargs):
+        from .concurrency import concurrent
+
+        with self.main_lock:
+            if key in self.refreshing:
+                return  # only one refresh at a time per key
+            self.refreshing.add(key)
+
+        def refresh():
+            try:
+                with self._get_key_lock(key):
+                    if self.log_recalculation:
+                        _logger.debug('refreshing time cache in the background for %s', self.__name__)
+                    self._store(key, self._calculate(args, kwargs))
+            finally:
+                with self.main_lock:
+                    self.refreshing.discard(key)
+
+        concurrent(refresh, throw=False, threadname="timecache-refresh-%s" % self.__name__).start()
+
+    def _touch(self, key):
+        # this is lock-free
+        if self.policy == 'lfu':
+            self.use_counts.touch(key)
+            return
+        try:
+            self.cache.move_to_end(key)
+        except KeyError:
+            pass  # evicted by another thread in the meantime
+
+    def _store(self, key, result):
+        # must be called while holding the key's lock; we always take the key lock before the main lock
+        now = self.get_ts_func()
+        with self.main_lock:
+            self.cache[key] = result, now
+            self.cache.move_to_end(key)
+
+            if self.expiration > 0 and now >= self.next_sweep:
+                # amortized sweep - at most once per expiration period
+                self._sweep_expired(now)
+                self.next_sweep = now + self.expiration + (self.stale_while_revalidate or 0)
+
+            if self.maxsize:
+                while len(self.cache) > self.maxsize:
+                    self._evict(exclude=key)
+
+            if self.policy == 'lfu':
+                self.use_counts.add(key)  # after evicting, so a new key is not the least used one
+
+    def _discard(self, key):
+        self.cache.pop(key, None)
+        self.use_counts.discard(key)
+        self.keyed_locks.pop(key, None)
+
+    def _sweep_expired(self, now):
+        # take a snapshot, since lock-free hits may reorder the cache while we iterate
+        max_age = self.expiration + (self.stale_while_revalidate or 0)
+        expired = [key for key, (_, ts) in list(self.cache.items()) if now - ts >= max_age]
+        for key in expired:
+            self._discard(key)
+        self._expirations += len(expired)
+
+    def _evict(self, exclude):
+        # take a snapshot, since lock-free hits may reorder the cache while we iterate
+        if self.policy == 'lru':
+            candidates = [key for key in list(islice(self.cache, 2)) if key != exclude]
+            key = candidates[0] if candidates else self.NOT_FOUND
+        else:
+            key = self.use_counts.find_least_used(exclude, default=self.NOT_FOUND)
+        if key is self.NOT_FOUND:
+            return
+        if self.log_recalculation:
+            _logger.debug('time cache full, evicting an entry from %s', self.__name__)
+        self._discard(key)
+        self._evictions += 1
+
     def cache_clear(self):
         with self.main_lock:
-            for key, lock in dict(self.keyed_locks).items():
-                with lock:
-                    self.cache.pop(key, None)
+            keys = list(self.cache)
+        for key in keys:
+            # don't hold the main lock while waiting on a key lock, to avoid a lock-order inversion
+            with self._get_key_lock(key), self.main_lock:
+                self.cache.pop(key, None)
+                self.use_counts.discard(key)
 
     def cache_pop(self, *args, **kwargs):
         key = self.make_key(args, kwargs)
-        self.keyed_locks.pop(key, None)
-        return self.cache.pop(key, None)
+        with self.main_lock:
+            self.keyed_locks.pop(key, None)
+            self.use_counts.discard(key)
+            return self.cache.pop(key, None)
 
     def _decorate(self, method, instance, owner):
         return type(self)(method, **self.kwargs)
 
 
-def timecache(expiration=0, typed=False, get_ts_func=time.time, log_recalculation=False, ignored_keywords=None, key_func=None):
+class _AsyncTimeCache(_TimeCache):
+    """
+    A ``timecache`` for coroutine functions. Calling it returns an awaitable, and concurrent misses on the
+    same key share a single in-flight task (single-flight), instead of locking.
+    """
+
+    def __init__(self, func, **kwargs):
+        super().__init__(func, **kwargs)
+        self.in_flight = {}
+
+    def __call__(self, *args, **kwargs):
+        key = self.make_key(args, kwargs)
+
+        result = self._lookup(key, args, kwargs)
+        if result is not self.NOT_FOUND:
+            future = asyncio.Future()
+            future.set_result(result)
+            return future
+
+        task = self.in_flight.get(key)
+        if task is None:
+            task = self._start(key, args, kwargs)
+        else:
+            self._hits += 1  # joined an in-flight calculation
+        # shielded, so that a cancelled awaiter does not cancel the task for the other awaiters
+        return asyncio.shield(task)
+
+    def _start(self, key, args, kwargs):
+        self._misses += 1
+        if self.log_recalculation:
+            _logger.debug('time cache expired, calculating new value for %s', self.__name__)
+        task = asyncio.ensure_future(self.func(*args, **kwargs))
+        self.in_flight[key] = task
+        task.add_done_callback(partial(self._on_done, key, time.perf_counter()))
+        return task
+
+    def _on_done(self, key, t0, task):
+        self._compute_time += time.perf_counter() - t0
+        if self.in_flight.get(key) is task:
+            del self.in_flight[key]
+        if not task.cancelled() and task.exception() is None:
+            self._store(key, task.result())
+
+    def _refresh_in_background(self, key, args, kwargs):
+        if key not in self.in_flight:
+            self._start(key, args, kwargs)
+
+
+def timecache(expiration=0, typed=False, get_ts_func=time.time, log_recalculation=False, ignored_keywords=None, key_func=None,
+              maxsize=None, policy='lru', lock_stripes=None, stale_while_revalidate=None, refresh_ahead=None):
     """
     A thread-safe cache decorator with time expiration.
 
@@ -313,17 +1222,43 @@ def timecache(expiration=0, typed=False, get_ts_func=time.time, log_recalculatio
     :type ignored_keywords: iterable, optional
     :param key_func: The function to use in order to create the item key, defaults to functools._make_key
     :type key_func: callable, optional
+    :param maxsize: The maximum number of items to keep in the cache, evicting items according to ``policy``. ``None`` for unbounded, defaults to None
+    :type maxsize: int, optional
+    :param policy: The eviction policy when the cache is full - ``'lru'`` (least recently used) or ``'lfu'`` (least frequently used), defaults to 'lru'
+    :type policy: str, optional
+    :param lock_stripes: If set, use a fixed number of locks (selected by the key's hash) instead of a lock per key.
+                         Keys that share a lock will wait on each other's calculation, so avoid this with functions
+                         that recursively call into the same cache. defaults to None
+    :type lock_stripes: int, optional
+    :param stale_while_revalidate: For this many seconds after an item expires, keep returning the expired value while
+                                   a background thread recalculates it, instead of blocking the caller. defaults to None
+    :type stale_while_revalidate: number, optional
+    :param refresh_ahead: A ratio (0..1) of ``expiration`` - items used after reaching this age are recalculated in the
+                          background before they expire. defaults to None
+    :type refresh_ahead: float, optional
+
+    Cache hits on populated, unexpired items do not take any lock.
+    When decorating a coroutine function, calls return an awaitable, and concurrent callers of the same
+    key await a single calculation.
+    Expired items are swept out of the cache (along with their locks) at most once every ``expiration`` seconds, so the cache
+    does not grow with keys that are never looked up again.
     """
 
     def deco(func):
-        return _TimeCache(
+        cache_type = _AsyncTimeCache if asyncio.iscoroutinefunction(func) else _TimeCache
+        return cache_type(
             func=func,
             expiration=expiration,
             typed=typed,
             get_ts_func=get_ts_func,
             log_recalculation=log_recalculation,
             ignored_keywords=ignored_keywords,
-            key_func=key_func)
+            key_func=key_func,
+            maxsize=maxsize,
+            policy=policy,
+            lock_stripes=lock_stripes,
+            stale_while_revalidate=stale_while_revalidate,
+            refresh_ahead=refresh_ahead)
 
     return deco
 
@@ -332,7 +1267,8 @@ timecache.__doc__ = _TimeCache.__doc__
 
 
 @parametrizeable_decorator
-def locking_cache(func=None, typed=False, log_recalculation=False, ignored_keywords=False):
+def locking_cache(func=None, typed=False, log_recalculation=False, ignored_keywords=False, maxsize=None, policy='lru',
+                  lock_stripes=None):
     """
     A syntactic sugar for a locking cache without time expiration.
 
@@ -342,14 +1278,26 @@ def locking_cache(func=None, typed=False, log_recalculation=False, ignored_keywo
     :type log_recalculation: bool, optional
     :param ignored_keywords: Arguments to ignore when caculating item key, defaults to None
     :type ignored_keywords: iterable, optional
+    :param maxsize: The maximum number of items to keep in the cache. ``None`` for unbounded, defaults to None
+    :type maxsize: int, optional
+    :param policy: The eviction policy when the cache is full - ``'lru'`` or ``'lfu'``, defaults to 'lru'
+    :type policy: str, optional
+    :param lock_stripes: If set, use a fixed number of locks instead of a lock per key (see ``timecache``), defaults to None
+    :type lock_stripes: int, optional
     """
 
-    return timecache(typed=typed, log_recalculation=log_recalculation, ignored_keywords=ignored_keywords)(func)
+    return timecache(
+        typed=typed, log_recalculation=log_recalculation, ignored_keywords=ignored_keywords,
+        maxsize=maxsize, policy=policy, lock_stripes=lock_stripes)(func)
 
 
-class cached_property(object):
+class cached_property(_CacheStats):
     """
     A property whose value is computed only once.
+    If the function is a coroutine function, the property returns a task that can be awaited any number of times,
+    and is recomputed on the next access if it fails.
+    Since the value is then stored on the instance, only the accesses that reach the property are counted in
+    its ``cache_info()``.
 
     :param function: Function to decorate, defaults to None
     :type function: function, optional
@@ -366,6 +1314,10 @@ class cached_property(object):
         self._function = function
         self._locking = locking
         self._safe = safe
+        self._init_stats()
+
+    def _cache_name(self):
+        return self._function.__qualname__ if self._function else None
 
     def __get__(self, obj, _=None):
         if obj is None:
@@ -377,14 +1329,21 @@ class cached_property(object):
                     with self.locks_lock:
                         if not hasattr(obj, self.LOCKS_KEY):
                             setattr(obj, self.LOCKS_KEY, defaultdict(RLock))
+                t0 = time.perf_counter()
                 stack.enter_context(getattr(obj, self.LOCKS_KEY)[func_name])
+                self._lock_wait_time += time.perf_counter() - t0
 
                 try:
                     # another thread has cached the value by the time we acquired the lock
-                    return getattr(obj, "_cached_%s" % func_name)
+                    value = getattr(obj, "_cached_%s" % func_name)
                 except AttributeError:
                     pass
+                else:
+                    self._hits += 1
+                    return value
 
+            self._misses += 1
+            t0 = time.perf_counter()
             try:
                 value = self._function(obj)
             except AttributeError:
@@ -393,11 +1352,24 @@ class cached_property(object):
                     raise RuntimeError("Attribute error within a property (%s)" % exc).with_traceback(tb)
                 else:
                     raise
+            finally:
+                self._compute_time += time.perf_counter() - t0
+
+            if asyncio.iscoroutinefunction(self._function):
+                value = asyncio.ensure_future(value)
+                value.add_done_callback(partial(self._forget_failure, obj, func_name))
 
             setattr(obj, "_cached_%s" % func_name, value)
             setattr(obj, func_name, value)
             return value
 
+    @staticmethod
+    def _forget_failure(obj, func_name, task):
+        if not task.cancelled() and task.exception() is None:
+            return
+        for name in ("_cached_%s" % func_name, func_name):
+            obj.__dict__.pop(name, None)
+
     def __call__(self, func):
         self._function = func
         return self
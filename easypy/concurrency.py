@@ -46,7 +46,7 @@ It can also be used to run something repeatedly in the background:
 Environment variables
 
     EASYPY_DISABLE_CONCURRENCY (yes|no|true|false|1|0)
-    EASYPY_MAX_THREAD_POOL_SIZE
+    EASYPY_MAX_THREAD_POOL_SIZE - the size of the shared thread pool (see ``set_max_thread_pool_size``)
 
 Important notes
 
@@ -60,21 +60,25 @@ Important notes
 """
 
 
-from concurrent.futures import ThreadPoolExecutor, CancelledError, as_completed, Future, wait as futures_wait
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, CancelledError, as_completed, Future
+from concurrent.futures import wait as futures_wait, FIRST_COMPLETED
 from concurrent.futures import TimeoutError as FutureTimeoutError
 
-from collections import defaultdict
+from collections import defaultdict, deque, OrderedDict
 from contextlib import contextmanager, ExitStack
 from functools import partial, wraps
 from importlib import import_module
-from itertools import chain
+from itertools import chain, count, islice, tee, takewhile
 from traceback import format_tb
+import heapq
 import inspect
 import logging
+import math
 import threading
 import time
 import os
 from collections import namedtuple
+from collections.abc import Sequence
 from datetime import datetime
 
 import easypy._multithreading_init  # noqa; make it initialize the threads tree
@@ -82,11 +86,12 @@ from easypy.exceptions import PException
 from easypy.gevent import is_module_patched, non_gevent_sleep, defer_to_thread
 from easypy.humanize import IndentableTextBuffer, time_duration, compact
 from easypy.humanize import format_thread_stack, yesno_to_bool
-from easypy.threadtree import iter_thread_frames
+from easypy.threadtree import iter_thread_frames, get_context_uuid, reparented
 from easypy.timing import Timer
-from easypy.units import MINUTE, HOUR
+from easypy.units import MINUTE, HOUR, Duration
 from easypy.colors import colorize, uncolored
 from easypy.sync import SynchronizationCoordinator, ProcessExiting, raise_in_main_thread
+from easypy.sync import CancellationToken, TaskCancelled, RateLimiter, get_rate_limiter
 
 
 MAX_THREAD_POOL_SIZE = int(os.environ.get('EASYPY_MAX_THREAD_POOL_SIZE', 50))
@@ -138,6 +143,245 @@ def enable():
     logging.info("Concurrency enabled")
 
 
+_THREAD_POOL = None
+_THREAD_POOL_PID = None
+_THREAD_POOL_LOCK = threading.Lock()
+_THREAD_POOL_RESERVED = 0  # the threads of the pool that are reserved by the running tasks of ``_PooledExecutor``
+_POOLED = threading.local()
+
+
+def set_max_thread_pool_size(size):
+    """
+    Resize the shared thread pool used by ``MultiObject``, ``concurrent_map`` and ``asynchronous``.
+    Tasks already running in the current pool are allowed to complete, while new tasks go to the new pool.
+    """
+    global MAX_THREAD_POOL_SIZE, _THREAD_POOL
+    with _THREAD_POOL_LOCK:
+        MAX_THREAD_POOL_SIZE = size
+        pool, _THREAD_POOL = _THREAD_POOL, None
+    if pool:
+        pool.shutdown(wait=False)
+
+
+def _get_thread_pool():
+    "Get the shared thread pool, creating it lazily (and again in forked processes, which don't inherit its threads)"
+    global _THREAD_POOL, _THREAD_POOL_PID
+    pool = _THREAD_POOL
+    if pool is None or _THREAD_POOL_PID != os.getpid():
+        with _THREAD_POOL_LOCK:
+            if _THREAD_POOL is None or _THREAD_POOL_PID != os.getpid():
+                _THREAD_POOL = ThreadPoolExecutor(MAX_THREAD_POOL_SIZE)
+                _THREAD_POOL_PID = os.getpid()
+            pool = _THREAD_POOL
+    return pool
+
+
+def _reserve_pool_thread():
+    "Reserve a thread of the shared pool for a task, returning ``False`` if they are all taken"
+    global _THREAD_POOL_RESERVED
+    with _THREAD_POOL_LOCK:
+        if _THREAD_POOL_RESERVED >= MAX_THREAD_POOL_SIZE:
+            return False
+        _THREAD_POOL_RESERVED += 1
+        return True
+
+
+def _release_pool_thread():
+    global _THREAD_POOL_RESERVED
+    with _THREAD_POOL_LOCK:
+        _THREAD_POOL_RESERVED -= 1
+
+
+def _resize_thread_pool(pool, delta):
+    """
+    Add ``delta`` threads to the capacity of ``pool``, to make up for (or, with a negative ``delta``, stop making up
+    for) threads held by abandoned tasks
+    """
+    with _THREAD_POOL_LOCK:
+        pool._max_workers += delta
+
+
+class _Scheduler(object):
+    """
+    Runs callbacks at given times on a single (daemon) thread, shared by all its users,
+    rather than on a ``threading.Timer`` thread per callback.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._counter = count()  # so that callbacks of the same time are never compared
+        self._condition = threading.Condition(threading.Lock())
+        self._thread_pid = None
+
+    def call_later(self, delay, func, *args):
+        with self._condition:
+            heapq.heappush(self._heap, (time.monotonic() + delay, next(self._counter), func, args))
+            if self._thread_pid != os.getpid():  # (again) in forked processes, which don't inherit our thread
+                self._thread_pid = os.getpid()
+                thread = threading.Thread(target=self._loop, name="easypy-scheduler", daemon=True)
+                thread.start()
+            self._condition.notify()
+
+    def _loop(self):
+        while True:
+            with self._condition:
+                while True:
+                    delay = self._heap[0][0] - time.monotonic() if self._heap else None
+                    if delay is not None and delay <= 0:
+                        break
+                    self._condition.wait(delay)
+                _, _, func, args = heapq.heappop(self._heap)
+            try:
+                func(*args)
+            except Exception:
+                _logger.exception("Scheduled call to %s failed", _get_func_name(func))
+
+
+_SCHEDULER = _Scheduler()
+KILLED_TASKS_GRACE_PERIOD = 10  # seconds, before letting go of the pool threads of tasks that don't stop
+
+
+class _PooledExecutor(object):
+    """
+    An executor that runs its tasks on the shared thread pool (or the given ``pool``), at most ``workers`` at a time
+    (a number or an ``AdaptiveLimit``), and no faster than the ``rate_limiter`` (a ``RateLimiter``) allows, if given.
+    Tasks inherit the thread-context of the thread that created the executor, as if they ran in its child threads.
+    Supports the subset of the ``Executor`` interface that ``asynchronous`` uses.
+
+    Each task reserves a thread of the shared pool while it runs, so that it never waits on the tasks of others.
+    If the pool has no threads left, the task runs on a dedicated thread instead.
+    Tasks that are still running ``KILLED_TASKS_GRACE_PERIOD`` seconds after ``shutdown(wait=False)`` (i.e. were
+    killed, but don't stop on their ``CancellationToken``) are let go of, and the pool gets a thread in their stead.
+    """
+
+    def __init__(self, workers, rate_limiter=None, pool=None):
+        self._workers = workers
+        self._rate_limiter = rate_limiter
+        self._pool = pool
+        self._overflow_pool = None  # for tasks that find no threads left in the shared pool
+        self._parent_uuid = get_context_uuid()
+        self._lock = threading.Lock()
+        self._pending = deque()
+        self._running = 0
+        self._futures = set()  # unfinished
+        self._pooled = {}  # running future -> the shared pool it holds a thread of
+        self._abandoned = set()  # running futures that don't hold their thread of the shared pool anymore
+        self._shutdown = False
+        self._throttled = False  # waiting for the rate limiter
+
+    def submit(self, func, *args, **kwargs):
+        future = Future()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError('cannot schedule new futures after shutdown')
+            self._pending.append((future, func, args, kwargs))
+            self._futures.add(future)
+        self._dispatch()
+        return future
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            self._shutdown = True
+            self._drop_cancelled()
+            running = self._running
+        if running and not wait:
+            _SCHEDULER.call_later(KILLED_TASKS_GRACE_PERIOD, self._abandon_running)
+        if wait:
+            with self._lock:
+                futures = list(self._futures)
+            futures_wait(futures)
+        for pool in (self._pool, self._overflow_pool):
+            if pool:
+                pool.shutdown(wait=wait)
+
+    def _dispatch(self):
+        limit = self._workers
+        while True:
+            with self._lock:
+                if self._rate_limiter:
+                    self._drop_cancelled()  # don't spend tokens on them
+                if isinstance(self._workers, AdaptiveLimit):
+                    limit = self._workers.limit
+                if self._running >= limit or not self._pending or self._throttled:
+                    return
+                if self._rate_limiter:
+                    delay = self._rate_limiter.try_acquire()
+                    if delay:
+                        self._throttled = True
+                        _SCHEDULER.call_later(delay, self._unthrottle)
+                        return
+                task = self._pending.popleft()
+                self._running += 1
+                if not self._pool and not _reserve_pool_thread():
+                    if not self._overflow_pool:
+                        max_limit = self._workers.max_limit if isinstance(self._workers, AdaptiveLimit) else limit
+                        self._overflow_pool = ThreadPoolExecutor(max_limit)
+                    self._overflow_pool.submit(self._run, None, *task)
+                    continue
+            if self._pool:
+                self._pool.submit(self._run, None, *task)
+                continue
+            pool = _get_thread_pool()
+            try:
+                pool.submit(self._run, pool, *task)
+            except RuntimeError:
+                if pool is _get_thread_pool():
+                    raise
+                pool = _get_thread_pool()  # the pool was resized just now
+                pool.submit(self._run, pool, *task)
+
+    def _drop_cancelled(self):
+        while self._pending and self._pending[0][0].cancelled():
+            future = self._pending.popleft()[0]
+            future.set_running_or_notify_cancel()
+            self._futures.discard(future)
+
+    def _abandon_running(self):
+        with self._lock:
+            abandoned = [(future, pool) for future, pool in self._pooled.items() if future not in self._abandoned]
+            self._abandoned.update(future for future, _ in abandoned)
+        if abandoned:
+            _logger.debug("Letting go of %s killed task(s) that are still running", len(abandoned))
+        for future, pool in abandoned:
+            _release_pool_thread()
+            _resize_thread_pool(pool, +1)
+
+    def _unthrottle(self):
+        with self._lock:
+            self._throttled = False
+        self._dispatch()
+
+    def _run(self, pool, future, func, args, kwargs):
+        if pool:
+            with self._lock:
+                self._pooled[future] = pool
+        try:
+            if not future.set_running_or_notify_cancel():
+                return
+            _POOLED.active = True
+            try:
+                with reparented(self._parent_uuid):
+                    result = func(*args, **kwargs)
+            except BaseException as exc:
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
+            finally:
+                _POOLED.active = False
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._futures.discard(future)
+                self._pooled.pop(future, None)
+                abandoned = future in self._abandoned
+                self._abandoned.discard(future)
+            if abandoned:
+                _resize_thread_pool(pool, -1)
+            elif pool:
+                _release_pool_thread()
+            self._dispatch()
+
+
 def _find_interesting_frame(f):
     """
     Find the next frame in the stack that isn't threading-related, to get to the actual caller.
@@ -186,9 +430,19 @@ class MultiExceptionMeta(type):
     __iter__ = None
 
     def __call__(cls, exceptions, futures):
-        common_type = concestor(*map(type, filter(None, exceptions)))
+        failed = [i for i, exc in enumerate(exceptions) if exc]
+        common_type = concestor(*(type(exceptions[i]) for i in failed))
         subtype = cls[common_type]
-        return type.__call__(subtype, exceptions, futures)
+        return type.__call__(subtype, exceptions, futures, _failed=failed)
+
+
+def _traceback_signature(tb):
+    "Helper for grouping exceptions with identical tracebacks, by the code locations in them"
+    signature = []
+    while tb:
+        signature.append((tb.tb_frame.f_code, tb.tb_lineno))
+        tb = tb.tb_next
+    return tuple(signature)
 
 
 PickledFuture = namedtuple("PickledFuture", "ctx, funcname")
@@ -207,29 +461,48 @@ class MultiException(PException, metaclass=MultiExceptionMeta):
     :param futures: a MultiObject of futures (:concurrent.futures.Future:) that were created in the ``MultiObject`` call
     :param exceptions: a sparse list of exceptions corresponding to the MultiObject threads
     :param complete: ``True`` if all threads failed on exception
+
+    Rendering it (and logging it) shows a summary, with exceptions of the same type and traceback grouped together.
+    Use ``render(full=True)`` for showing each of the exceptions.
     """
 
     template = "{0.common_type.__qualname__} raised from concurrent invocation (x{0.count}/{0.invocations_count})"
+    MAX_GROUPED_CONTEXTS = 5  # the contexts listed for the rest of the exceptions in a group
 
     def __reduce__(self):
         return (MultiException, (self.exceptions, [PickledFuture(ctx=f.ctx, funcname=f.funcname) for f in self.futures]))
 
-    def __init__(self, exceptions, futures):
+    def __init__(self, exceptions, futures, _failed=None):
         # we want to keep futures in parallel with exceptions,
         # so some exceptions could be None
         assert len(futures) == len(exceptions)
-        self.actual = MultiObject(filter(None, exceptions))
-        self.count = len(self.actual)
+        if _failed is None:
+            _failed = [i for i, exc in enumerate(exceptions) if exc]
+        self._failed = _failed  # the indices of the exceptions
+        self._actual = None
+        self._futures = futures
+        self.count = len(_failed)
         self.invocations_count = len(futures)
         self.common_type = self.COMMON_TYPE
-        self.one = self.actual.T[0] if self.actual else None
-        self.futures = MultiObject(futures)
+        self.one = exceptions[_failed[0]] if _failed else None
         self.exceptions = exceptions
         self.complete = self.count == self.invocations_count
         if self.complete and hasattr(self.common_type, 'exit_with_code'):
             self.exit_with_code = self.common_type.exit_with_code
         super().__init__(self.template, self)
 
+    @property
+    def actual(self):
+        if self._actual is None:
+            self._actual = MultiObject([self.exceptions[i] for i in self._failed])
+        return self._actual
+
+    @property
+    def futures(self):
+        if not isinstance(self._futures, MultiObject):
+            self._futures = MultiObject(self._futures)
+        return self._futures
+
     def __repr__(self):
         return "{0.__class__.__name__}(x{0.count}/{0.invocations_count})".format(self)
 
@@ -245,12 +518,12 @@ class MultiException(PException, metaclass=MultiExceptionMeta):
             else:
                 yield exc
 
-    def render(self, *, width=80, color=True, **kw):
-        buff = self._get_buffer(color=color, **kw)
+    def render(self, *, width=80, color=True, full=False, **kw):
+        buff = self._get_buffer(color=color, full=full, **kw)
         text = buff.render(width=width, edges=not color)
         return colorize("\n" + text)
 
-    def _get_buffer(self, **kw):
+    def _get_buffer(self, full=False, **kw):
         if kw.get("color", True):
             normalize_color = lambda x: x
         else:
@@ -264,6 +537,11 @@ class MultiException(PException, metaclass=MultiExceptionMeta):
             breadcrumbs = ";".join(context.pop('context', []))
             return ", ".join(filter(None, chain((breadcrumbs,), ("%s=%s" % p for p in sorted(context.items())))))
 
+        def _format_breadcrumbs(context):
+            if not isinstance(context, dict):
+                return repr(context)  # when it comes from rpyc
+            return ";".join(context.get('context', []))
+
         buff = IndentableTextBuffer("{0.__class__.__qualname__}", self)
         if self.message:
             buff.write(normalize_color("WHITE<<%s>>" % self.message))
@@ -287,21 +565,45 @@ class MultiException(PException, metaclass=MultiExceptionMeta):
 
         add_details(self)
 
-        for exc in self.actual:
-            with buff.indent("{.__class__.__qualname__}", exc):
-                if isinstance(exc, MultiException):
-                    buff.extend(exc._get_buffer(**kw))
-                elif callable(getattr(exc, "render", None)):
-                    buff.write(exc.render(**kw))
-                else:
-                    buff.write("{}", exc)
-                    add_details(exc)
-                if hasattr(exc, "__traceback__"):
-                    show_traceback = getattr(exc, 'traceback', None)
-                    if show_traceback is not False:
-                        buff.write("Traceback:")
-                        for line in format_tb(exc.__traceback__):
-                            buff.write(traceback_fmt, line.rstrip())
+        def add_exception(exc):
+            if isinstance(exc, MultiException):
+                buff.extend(exc._get_buffer(full=full, **kw))
+            elif callable(getattr(exc, "render", None)):
+                buff.write(exc.render(**kw))
+            else:
+                buff.write("{}", exc)
+                add_details(exc)
+            if hasattr(exc, "__traceback__"):
+                show_traceback = getattr(exc, 'traceback', None)
+                if show_traceback is not False:
+                    buff.write("Traceback:")
+                    for line in format_tb(exc.__traceback__):
+                        buff.write(traceback_fmt, line.rstrip())
+
+        if full:
+            for exc in self.actual:
+                with buff.indent("{.__class__.__qualname__}", exc):
+                    add_exception(exc)
+            return buff
+
+        groups = OrderedDict()
+        for i in self._failed:
+            exc = self.exceptions[i]
+            key = type(exc), _traceback_signature(getattr(exc, "__traceback__", None))
+            groups.setdefault(key, []).append(exc)
+
+        for (typ, _), (exc, *others) in groups.items():
+            header = "%s (x%s)" % (typ.__qualname__, 1 + len(others)) if others else typ.__qualname__
+            with buff.indent("{}", header):
+                add_exception(exc)
+                if not others:
+                    continue
+                contexts = [_format_breadcrumbs(other.context) for other in others[:self.MAX_GROUPED_CONTEXTS]
+                            if getattr(other, "context", None)]
+                if contexts and len(others) > len(contexts):
+                    contexts.append("...")
+                buff.write(normalize_color("DARK_GRAY<<...and %s more like it%s>>" % (
+                    len(others), (": " + ", ".join(contexts)) if contexts else "")))
 
         return buff
 
@@ -311,12 +613,37 @@ def _submit_execution(executor, func, args, kwargs, ctx, funcname=None):
     This helper takes care of submitting a function for asynchronous execution, while wrapping and storing
     useful information for tracing it in logs (for example, by ``Futures.dump_stacks``)
     """
-    future = executor.submit(_run_with_exception_logging, func, args, kwargs, ctx)
+    timing = _TaskTiming()
+    future = executor.submit(_run_with_exception_logging, func, args, kwargs, ctx, timing)
     future.ctx = ctx
     future.funcname = funcname or _get_func_name(func)
+    future.timing = timing
     return future
 
 
+class _TaskTiming(object):
+    "The start and end times of a task, stamped by ``_run_with_exception_logging``"
+
+    __slots__ = ('started', 'ended')
+
+    def __init__(self):
+        self.started = self.ended = None
+
+
+class FuturesStats(namedtuple("FuturesStats", "total completed running elapsed throughput p50 p99 eta")):
+    """
+    A snapshot of the progress of a ``Futures`` collection (see ``Futures.stats``).
+    ``throughput`` (tasks per second), and the ``p50``/``p99`` task latencies, are of the recently completed tasks.
+    ``eta`` is the estimated time (in seconds) for the rest to complete, or ``None`` if it can't be estimated yet.
+    """
+
+    def __str__(self):
+        def fmt(duration):
+            return "?" if duration is None else Duration(duration).render(precision=0)
+        return "%s/%s done (%s running), %.1f/s, p50=%s, p99=%s, ETA %s" % (
+            self.completed, self.total, self.running, self.throughput or 0, fmt(self.p50), fmt(self.p99), fmt(self.eta))
+
+
 class Futures(list):
     """
     A collection of ``Future`` objects.
@@ -381,6 +708,34 @@ class Futures(list):
         """
         return as_completed(self, timeout=timeout)
 
+    def stats(self, window=1000):
+        """
+        Return a ``FuturesStats`` snapshot of the progress of these futures, with the throughput and latencies taken
+        over the last ``window`` completed tasks. Only futures submitted by ``_submit_execution`` are timed.
+        """
+        now = time.time()
+        timings = [f.timing for f in self if getattr(f, 'timing', None) and f.timing.started]
+        started = min((t.started for t in timings), default=None)
+        recent = sorted((t for t in timings if t.ended), key=lambda t: t.ended)
+        completed = len(recent)
+        running = len(timings) - completed
+        if completed > window:
+            since = recent[-window - 1].ended  # the rate of the last 'window' completions
+            recent = recent[-window:]
+        else:
+            since = started
+
+        throughput = len(recent) / (now - since) if recent and now > since else None
+        durations = sorted(t.ended - t.started for t in recent)
+
+        def percentile(percentile):
+            return durations[min(len(durations) - 1, int(len(durations) * percentile / 100))] if durations else None
+
+        return FuturesStats(
+            total=len(self), completed=completed, running=running, elapsed=now - started if started else 0,
+            throughput=throughput, p50=percentile(50), p99=percentile(99),
+            eta=(len(self) - completed) / throughput if throughput else None)
+
     @classmethod
     @contextmanager
     def execution(cls, workers=MAX_THREAD_POOL_SIZE, log_ctx={}):
@@ -394,17 +749,24 @@ class Futures(list):
             results = futures.results()
         """
         futures = cls()
+        futures.cancellation_token = cancellation_token = CancellationToken()
         with ThreadPoolExecutor(workers) as executor:
 
             def submit(func, *args, log_ctx={}, **kwargs):
                 "Submit a new asynchronous task to this executor"
 
-                future = _submit_execution(executor, func, args, kwargs, ctx=dict(log_ctx, **log_ctx))
+                funcname = _get_func_name(func)
+                if _takes_param(func, '_cancel') and '_cancel' not in kwargs:
+                    kwargs['_cancel'] = cancellation_token
+                future = _submit_execution(executor, cancellation_token.bind(func), args, kwargs,
+                                           ctx=dict(log_ctx, **log_ctx), funcname=funcname)
                 futures.append(future)
                 return future
 
             def kill():
-                "Kill the executor, letting go of any running tasks"
+                "Kill the executor, letting go of any running tasks, after cancelling them (see ``CancellationToken``)"
+                futures.cancel()
+                cancellation_token.cancel()
                 executor.shutdown(wait=False)
                 executor._threads.clear()
 
@@ -463,64 +825,110 @@ class Futures(list):
         context.extend("%s=%s" % (k, compacted(v)) for k, v in sorted(ctx.items()))
         return ";".join(filter(None, context))
 
-    def logged_wait(self, timeout=None, initial_log_interval=2 * MINUTE):
+    def logged_wait(self, timeout=None, initial_log_interval=2 * MINUTE, progress=None, progress_interval=1):
         """
         Wait for all futures to complete, logging their status along the way.
         Logging will occur at an every-increasing log interval, beginning with ``initial_log_interval``,
         and increasing 5-fold (x5) every 5 iterations.
+
+        :param progress: A callback for reporting the progress every ``progress_interval`` seconds, called with the
+                         ``FuturesStats`` of these futures (see ``stats``). If ``True``, show it on the progress bar.
         """
+        if progress is True:
+            from .logging import PROGRESS_BAR
+            with PROGRESS_BAR() as progress_bar:
+                return self.logged_wait(timeout, initial_log_interval, lambda stats: progress_bar.set_message(
+                    "Waiting on %s: %s" % (self[0].funcname if self else "...", stats)), progress_interval)
+
         log_interval = initial_log_interval
+        log_timer = Timer(expiration=log_interval)
         global_timer = Timer(expiration=timeout)
         iteration = 0
 
         while not global_timer.expired:
-            completed, pending = self.wait(log_interval)
+            wait_timeout = log_timer.remain
+            if progress:
+                wait_timeout = progress_interval if wait_timeout is None else min(wait_timeout, progress_interval)
+            completed, pending = self.wait(wait_timeout)
+            if progress:
+                progress(self.stats())
             if not pending:
                 break
+            if not log_timer.expired:
+                continue
 
             iteration += 1
             if iteration % 5 == 0:
                 log_interval *= 5
-            with _logger.indented("(Waiting for %s on %s/%s tasks...)",
-                                  time_duration(global_timer.elapsed),
-                                  len(pending), sum(map(len, (completed, pending))),
-                                  level=logging.WARNING, footer=False):
-                self.dump_stacks(pending, verbose=global_timer.elapsed >= HOUR)
+            log_timer = Timer(expiration=log_interval)
+            self._log_pending(pending, global_timer)
+
+    def _log_pending(self, pending, global_timer, total=None):
+        with _logger.indented("(Waiting for %s on %s/%s tasks...)",
+                              time_duration(global_timer.elapsed), len(pending), total or len(self),
+                              level=logging.WARNING, footer=False):
+            self.dump_stacks(pending, verbose=global_timer.elapsed >= HOUR)
 
 
-def _run_with_exception_logging(func, args, kwargs, ctx):
+def _run_with_exception_logging(func, args, kwargs, ctx, timing=None):
     """
     Use as a wrapper for functions that run asynchronously, setting up a logging context and
     recording the thread in-which they are running, so that we can later log their progress
     and identify the source of exceptions they raise. In addition, it stamps any exception
-    raised from the function with the current time.
+    raised from the function with the current time, and the ``timing`` (if given) with the
+    start and end times of the call.
     """
     thread = threading.current_thread()
     ctx.update(threadname=thread.name, thread_ident=thread.ident)
+    if timing:
+        timing.started = time.time()
     with _logger.context(**ctx):
         try:
             return func(*args, **kwargs)
-        except StopIteration:
-            # no need to log this
-            raise
-        except ProcessExiting as exc:
-            _logger.debug(exc)
-            raise
         except Exception as exc:
-            _logger.silent_exception(
-                "Exception (%s) in thread running %s (traceback in debug logs)",
-                exc.__class__.__qualname__, func)
-            try:
-                exc.timestamp = time.time()
-            except:  # noqa - sometimes exception objects are immutable
-                pass
+            _log_exception(exc, func)
             raise
+        finally:
+            if timing:
+                timing.ended = time.time()
+
+
+def _takes_param(func, name):
+    "Helper for checking whether ``func`` takes a special parameter, such as ``_sync`` or ``_cancel``"
+    try:
+        return name in inspect.signature(func).parameters
+    except ValueError:
+        return False  # In Python 3.5+, inspect.signature raises this for built-in types
+
+
+def _log_exception(exc, func):
+    """
+    Log an exception raised from a function running asynchronously (call from within the ``except`` clause),
+    and stamp it with the current time.
+    """
+    if isinstance(exc, StopIteration):
+        return  # no need to log this
+    if isinstance(exc, (ProcessExiting, TaskCancelled)):
+        _logger.debug(exc)
+        return
+    _logger.silent_exception(
+        "Exception (%s) in thread running %s (traceback in debug logs)",
+        exc.__class__.__qualname__, func)
+    try:
+        exc.timestamp = time.time()
+    except:  # noqa - sometimes exception objects are immutable
+        pass
+
+
+def _iter_args(params):
+    "Helper for normalizing parameters to be mapped on a function"
+    # We use type(args) == tuple because isinstance will return True for namedtuple
+    return (args if type(args) == tuple else (args,) for args in params)
 
 
 def _to_args_list(params):
     "Helper for normalizing a list of parameters to be mapped on a function"
-    # We use type(args) == tuple because isinstance will return True for namedtuple
-    return [args if type(args) == tuple else (args,) for args in params]
+    return list(_iter_args(params))
 
 
 def _get_func_name(func):
@@ -536,6 +944,30 @@ def _get_func_name(func):
     return funcname
 
 
+class _LazyLogContexts(Sequence):
+    """
+    The default log contexts of the ``MultiObject`` items, made only when used (when dispatching calls on the items),
+    rather than on every construction of a ``MultiObject``. Each context is made once, and copied for later uses.
+    """
+
+    def __init__(self, items, make_ctx):
+        self._items = items
+        self._make_ctx = make_ctx
+        self._ctxs = [None] * len(items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(len(self._items))[index]]
+        ctx = self._ctxs[index]
+        if ctx is None:
+            index %= len(self._items)
+            ctx = self._ctxs[index] = self._make_ctx(index, self._items[index])
+        return dict(ctx)  # a copy, since each call adds its thread to its context
+
+
 def _to_log_contexts(params, log_contexts):
     "Helper for normalizing a list of parameters and log-contexts into a list of usable log context dicts"
     if not log_contexts:
@@ -546,8 +978,51 @@ def _to_log_contexts(params, log_contexts):
     return log_contexts
 
 
+_LEARNED_COSTS = defaultdict(OrderedDict)  # funcname -> {item context: duration of its last call}
+MAX_LEARNED_COSTS = 10000  # per function
+
+
+def _get_context_key(ctx):
+    "Helper for identifying an item across calls, by its logging context"
+    return ctx.get('context') or repr(sorted(ctx.items()))
+
+
+def _learning_cost(func, costs, key):
+    "Helper for recording the duration of a call into ``costs``, for ``cost_key=True``"
+    @wraps(func)
+    def inner(*args, **kwargs):
+        t0 = time.time()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            costs.pop(key, None)
+            costs[key] = time.time() - t0
+            while len(costs) > MAX_LEARNED_COSTS:
+                costs.popitem(last=False)
+    return inner
+
+
+def _to_rate_limiter(rate, burst=1):
+    "Helper for normalizing a ``rate`` parameter (calls per second, a ``RateLimiter``, or the name of a shared one)"
+    if not rate or isinstance(rate, RateLimiter):
+        return rate or None
+    if isinstance(rate, str):
+        return get_rate_limiter(rate)
+    return RateLimiter(rate, burst)
+
+
+def _rate_limited(func, rate_limiter):
+    "Helper for waiting on the ``rate_limiter`` before each call, when dispatching can't be limited"
+    @wraps(func)
+    def inner(*args, **kwargs):
+        rate_limiter.acquire()
+        return func(*args, **kwargs)
+    return inner
+
+
 @contextmanager
-def asynchronous(func, params=None, workers=None, log_contexts=None, final_timeout=2.0, **kw):
+def asynchronous(func, params=None, workers=None, log_contexts=None, final_timeout=2.0, cost_key=None,
+                 rate=None, burst=1, **kw):
     """
     Map the list of tuple-parameters onto asynchronous calls to the specified function::
 
@@ -559,8 +1034,26 @@ def asynchronous(func, params=None, workers=None, log_contexts=None, final_timeo
     :param func: The callable to invoke asynchronously.
     :param params: A list of tuples to map onto the function.
     :param workers: The number of workers to use. Defaults to the number of items in ``params``.
+                    If ``'adaptive'``, the number of calls in flight adapts to their latencies and failures,
+                    up to that number (see ``AdaptiveLimit``).
     :param log_contexts: A optional list of logging context objects, matching the items in ``params``.
     :param final_timeout: The amount of time to allow for the futures to complete after exiting the asynchronous context.
+    :param cost_key: Dispatch the calls longest-first, by the estimated cost that this function returns for the parameters
+                     of each call, for a shorter overall run time when the ``workers`` are limited and the costs vary.
+                     If ``True``, use the durations of previous calls to this function on the same items (identified by
+                     their logging context), with new items going first. Can also be a list of the costs of the calls,
+                     matching ``params``.
+    :param rate: Limit the calls to ``rate`` calls per second, with bursts of up to ``burst`` calls (see ``RateLimiter``).
+                 Can also be a ``RateLimiter``, or the name of one (see ``get_rate_limiter``), for sharing the limit
+                 among several calls.
+
+    Killing the futures (``futures.kill()``, or an exception in the context) cancels their ``CancellationToken``
+    (``futures.cancellation_token``), so that calls already running can stop (see ``CancellationToken``).
+    If ``func`` takes a ``_cancel`` parameter, it gets the token.
+
+    The calls run on a shared thread pool (see ``set_max_thread_pool_size``), except for calls made from within that
+    pool, or of functions that take a ``_sync`` parameter. Those get their own threads, since the pool might not have
+    enough threads left for them and deadlock.
     """
     if params is None:
         params = [()]
@@ -571,10 +1064,14 @@ def asynchronous(func, params=None, workers=None, log_contexts=None, final_timeo
     params = _to_args_list(params)
     log_contexts = _to_log_contexts(params, log_contexts)
 
+    adaptive = workers == 'adaptive'
+    if adaptive:
+        workers = None
     workers = workers or min(MAX_THREAD_POOL_SIZE, len(params))
-    executor = ThreadPoolExecutor(workers) if workers else None
+    dedicated = getattr(_POOLED, 'active', False)
 
     funcname = _get_func_name(func)
+    cancellation_token = CancellationToken()
 
     try:
         signature = inspect.signature(func)
@@ -582,21 +1079,56 @@ def asynchronous(func, params=None, workers=None, log_contexts=None, final_timeo
         # In Python 3.5+, inspect.signature returns this for built-in types
         pass
     else:
+        if '_cancel' in signature.parameters and '_cancel' not in kw:
+            kw['_cancel'] = cancellation_token
+
         if '_sync' in signature.parameters and '_sync' not in kw:
             assert len(params) <= workers, 'SynchronizationCoordinator with %s tasks but only %s workers' % (len(params), workers)
             synchronization_coordinator = SynchronizationCoordinator(len(params))
             kw['_sync'] = synchronization_coordinator
 
             func = synchronization_coordinator._abandon_when_done(func)
-
-    futures = Futures()
-    for args, ctx in zip(params, log_contexts):
-        future = _submit_execution(executor, func, args, kw, ctx=ctx, funcname=funcname)
-        futures.append(future)
+            dedicated = True  # all tasks must be running at the same time
+            adaptive = False
+
+    rate_limiter = _to_rate_limiter(rate, burst)
+    if not workers:
+        executor = None
+    elif adaptive:
+        adaptive = AdaptiveLimit(max_limit=workers)
+        executor = _PooledExecutor(adaptive, rate_limiter, pool=ThreadPoolExecutor(workers) if dedicated else None)
+    elif dedicated:
+        executor = ThreadPoolExecutor(workers)
+        if rate_limiter:
+            func = _rate_limited(func, rate_limiter)
+    else:
+        executor = _PooledExecutor(workers, rate_limiter)
+
+    func = cancellation_token.bind(func)
+    tasks = list(zip(params, log_contexts))
+    order = range(len(tasks))
+    if cost_key is True:
+        costs = _LEARNED_COSTS[funcname]
+        keys = [_get_context_key(ctx) for args, ctx in tasks]
+        order = sorted(order, key=lambda i: -costs.get(keys[i], float('inf')))
+    elif isinstance(cost_key, (list, tuple)):
+        order = sorted(order, key=lambda i: -cost_key[i])
+    elif cost_key:
+        order = sorted(order, key=lambda i: -cost_key(*tasks[i][0]))
+
+    futures = Futures([None] * len(tasks))
+    futures.cancellation_token = cancellation_token
+    for i in order:
+        args, ctx = tasks[i]
+        task_func = _learning_cost(func, costs, keys[i]) if cost_key is True else func
+        futures[i] = _submit_execution(executor, task_func, args, kw, ctx=ctx, funcname=funcname)
+        if adaptive:
+            futures[i].add_done_callback(adaptive.track)
 
     def kill(wait=False):
         nonlocal killed
         futures.cancel()
+        cancellation_token.cancel()
         if executor:
             executor.shutdown(wait=wait)
         killed = True
@@ -607,7 +1139,7 @@ def asynchronous(func, params=None, workers=None, log_contexts=None, final_timeo
     try:
         yield futures
     except:
-        _logger.debug("shutting down ThreadPoolExecutor due to exception")
+        _logger.debug("shutting down executor due to exception")
         kill(wait=False)
         raise
     else:
@@ -646,7 +1178,176 @@ def concurrent_find(func, params, **kw):
             _logger.warning("Concurrent future timed out (%s)", exc)
 
 
+class LatencyTracker(object):
+    """
+    Tracks the latencies of the last ``size`` calls, for estimating their percentiles (see ``hedged_call``).
+    """
+
+    def __init__(self, size=100, min_samples=10):
+        self._samples = deque(maxlen=size)
+        self.min_samples = min_samples
+
+    def add(self, latency):
+        self._samples.append(latency)
+
+    def percentile(self, percentile):
+        "Return the given percentile of the tracked latencies, or ``None`` if there are less than ``min_samples``"
+        samples = sorted(self._samples)
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * percentile / 100))]
+
+
+_LATENCIES = OrderedDict()  # (funcname, replicas) -> LatencyTracker, least recently used first
+MAX_LATENCY_TRACKERS = 1000
+_LATENCIES_LOCK = threading.Lock()
+
+
+def _get_latency_tracker(funcname, log_contexts):
+    "Helper for getting the default ``LatencyTracker`` of ``hedged_call``, for calls of ``funcname`` on these replicas"
+    key = funcname, tuple(_get_context_key(ctx) for ctx in log_contexts)
+    with _LATENCIES_LOCK:
+        latencies = _LATENCIES.pop(key, None) or LatencyTracker()
+        _LATENCIES[key] = latencies
+        while len(_LATENCIES) > MAX_LATENCY_TRACKERS:
+            _LATENCIES.popitem(last=False)
+    return latencies
+
+
+class AdaptiveLimit(object):
+    """
+    An adaptive limit on the number of calls in flight, for ``workers='adaptive'`` - additive increase, multiplicative
+    decrease (AIMD), as in TCP congestion control. Starting at ``initial``, the latencies and failures of the calls
+    are judged in rounds of ``limit`` calls: the limit is raised by one if the p95 latency of the round stayed within
+    ``tolerance`` times the baseline, and at most ``error_rate`` of the calls failed, and is otherwise cut by ``backoff``.
+
+    The baseline follows the lowest p95 seen, and drifts up towards higher ones by ``baseline_decay`` of the difference
+    every round (an exponentially weighted moving average), so that after a lasting shift in latency the limit grows
+    again, rather than being cut for good.
+    """
+
+    def __init__(self, initial=2, min_limit=1, max_limit=MAX_THREAD_POOL_SIZE, tolerance=2.0, error_rate=0.1,
+                 backoff=0.5, baseline_decay=0.2):
+        self.min_limit = min_limit
+        self.max_limit = max(min_limit, max_limit)
+        self.limit = min(max(initial, self.min_limit), self.max_limit)
+        self.tolerance = tolerance
+        self.error_rate = error_rate
+        self.backoff = backoff
+        self.baseline_decay = baseline_decay
+        self.baseline = None
+        self._latencies = []  # of the current round
+        self._errors = 0
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "<%s %s (%s-%s)>" % (self.__class__.__name__, self.limit, self.min_limit, self.max_limit)
+
+    def add(self, latency, failed=False):
+        "Add the latency of a completed call, and whether it failed"
+        with self._lock:
+            self._latencies.append(latency)
+            self._errors += bool(failed)
+            if len(self._latencies) < self.limit:
+                return
+
+            latencies = sorted(self._latencies)
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * .95))]
+            error_rate = self._errors / len(latencies)
+            self._latencies = []
+            self._errors = 0
+
+            if self.baseline is None or p95 < self.baseline:
+                self.baseline = p95
+            else:
+                self.baseline += (p95 - self.baseline) * self.baseline_decay
+            if error_rate > self.error_rate or p95 > self.baseline * self.tolerance:
+                self.limit = max(self.min_limit, int(self.limit * self.backoff))
+            else:
+                self.limit = min(self.max_limit, self.limit + 1)
+
+    def track(self, future):
+        "Add the latency of a future submitted by ``_submit_execution`` (use as a done-callback)"
+        timing = getattr(future, 'timing', None)
+        if future.cancelled() or not (timing and timing.started and timing.ended):
+            return
+        exception = future.exception()
+        if isinstance(exception, TaskCancelled):
+            return
+        self.add(timing.ended - timing.started, failed=exception is not None)
+
+
+def hedged_call(func, params, delay=None, percentile=95, timeout=None, log_contexts=None, **kw):
+    """
+    Call ``func`` on the first of ``params`` (for example, a replica of a service), and if it did not complete after
+    ``delay`` seconds, or failed, call it on the next one as well, and so on, returning the result of the first call
+    that succeeds. Raises a ``MultiException`` if all the calls failed, or ``TimeoutError`` after ``timeout``.
+
+    Once a call succeeded, the others are cancelled via their ``CancellationToken`` (see ``asynchronous``),
+    so that they can stop their work.
+
+    :param delay: The number of seconds to wait before hedging, or a ``LatencyTracker``. Defaults to a tracker of
+                  the latencies of this function's successful calls on these ``params`` (identified by their logging
+                  contexts), so it hedges the calls slower than its ``percentile``. Until the tracker has enough
+                  samples, only failed calls are hedged.
+    """
+    params = _to_args_list(list(params))
+    log_contexts = list(_to_log_contexts(params, log_contexts))
+    funcname = _get_func_name(func)
+
+    if delay is None:
+        latencies = _get_latency_tracker(funcname, log_contexts)
+    else:
+        latencies = delay if isinstance(delay, LatencyTracker) else None
+    if latencies:
+        delay = latencies.percentile(percentile)
+
+    cancellation_token = CancellationToken()
+    if _takes_param(func, '_cancel'):
+        kw['_cancel'] = cancellation_token
+    func = cancellation_token.bind(func)
+
+    executor = ThreadPoolExecutor(len(params)) if getattr(_POOLED, 'active', False) else _PooledExecutor(len(params))
+    global_timer = Timer(expiration=timeout)
+    futures = Futures()
+
+    def hedge():
+        i = len(futures)
+        future = _submit_execution(executor, func, params[i], kw, ctx=log_contexts[i], funcname=funcname)
+        future.started = time.time()
+        futures.append(future)
+        if i:
+            _logger.debug("hedging %s on %s", funcname, log_contexts[i])
+
+    try:
+        hedge()
+        while True:
+            more = len(futures) < len(params)
+            wait_timeout = global_timer.remain
+            if more and delay is not None:
+                wait_timeout = delay if wait_timeout is None else min(wait_timeout, delay)
+            futures_wait([f for f in futures if not f.done()], timeout=wait_timeout, return_when=FIRST_COMPLETED)
+
+            for future in futures:
+                if future.done() and not future.exception():
+                    if latencies:
+                        latencies.add(time.time() - future.started)
+                    return future.result()
+            if global_timer.expired:
+                raise FutureTimeoutError("%s did not complete in %s" % (funcname, time_duration(timeout)))
+            elif more:
+                hedge()  # the delay passed, or a call failed
+            elif futures.done():
+                raise futures.exception()
+    finally:
+        cancellation_token.cancel()
+        futures.cancel()
+        executor.shutdown(wait=False)
+
+
 def nonconcurrent_map(func, params, log_contexts=None, **kw):
+    if _takes_param(func, '_cancel') and '_cancel' not in kw:
+        kw['_cancel'] = CancellationToken()
     futures = Futures()
     log_contexts = _to_log_contexts(params, log_contexts)
     has_exceptions = False
@@ -670,12 +1371,206 @@ def nonconcurrent_map(func, params, log_contexts=None, **kw):
     return results
 
 
-def concurrent_map(func, params, workers=None, log_contexts=None, initial_log_interval=None, **kw):
+def _run_chunk(func, chunk, kwargs):
+    """
+    Run ``func`` on each of the ``(args, ctx)`` pairs in ``chunk``, returning a list of ``(exception, result)`` pairs.
+    Used for dispatching several calls as a single task, to amortize the per-call overhead. For the same reason,
+    the calls run under the logging context of the chunk, and an item's context is only applied if its call fails.
+    """
+    results = []
+    for args, ctx in chunk:
+        try:
+            results.append((None, func(*args, **kwargs)))
+        except Exception as exc:
+            try:
+                with _logger.context(**ctx):
+                    _log_exception(exc, func)
+                    raise  # so that the item's context gets attached to the exception
+            except Exception:
+                pass
+            results.append((exc, None))
+    return results
+
+
+def _chunked_map(func, params, workers=None, log_contexts=None, initial_log_interval=None, chunksize=None,
+                 backend='thread', **kw):
+    """
+    Map the list of tuple-parameters onto ``func``, sending them to the workers in chunks of ``chunksize``
+    (by default, a few chunks per worker), and collecting the failures of individual calls into a ``MultiException``.
+
+    With the ``'process'`` backend, the calls run in a pool of processes (default: one per CPU), so the function,
+    parameters and results must be picklable, and the exceptions lose their tracebacks.
+    If ``func`` takes a ``_cancel`` parameter, it gets a ``CancellationToken`` that is cancelled if the map is aborted
+    (threads only, since the token cannot be sent to other processes).
+    """
+    params = _to_args_list(params)
+    if not params:
+        return []
+    items = list(zip(params, _to_log_contexts(params, log_contexts)))
+    funcname = _get_func_name(func)
+
+    cancellation_token = None
+    if _takes_param(func, '_cancel') and '_cancel' not in kw:
+        assert backend != 'process', "%s takes a '_cancel' parameter, which is not supported with processes" % funcname
+        kw['_cancel'] = cancellation_token = CancellationToken()
+
+    if backend == 'process':
+        workers = workers or min(os.cpu_count() or 1, len(items))
+        executor = ProcessPoolExecutor(workers)
+    else:
+        workers = workers or min(MAX_THREAD_POOL_SIZE, len(items))
+        executor = ThreadPoolExecutor(workers) if getattr(_POOLED, 'active', False) else _PooledExecutor(workers)
+
+    chunksize = chunksize or math.ceil(len(items) / (workers * 4))
+    chunks = [items[i:i + chunksize] for i in range(0, len(items), chunksize)]
+    chunk_futures = Futures()
+    try:
+        for i, chunk in enumerate(chunks):
+            ctx = dict(context="%s (chunk %s/%s)" % (funcname, i + 1, len(chunks)))
+            chunk_futures.append(_submit_execution(executor, _run_chunk, (func, chunk, kw), {}, ctx, funcname=funcname))
+        chunk_futures.logged_wait(initial_log_interval=initial_log_interval)
+    finally:
+        if cancellation_token:
+            cancellation_token.cancel()
+        executor.shutdown(wait=True)
+
+    results = []
+    for chunk, chunk_future in zip(chunks, chunk_futures):
+        exc = chunk_future.exception()  # the chunk failed as a whole (could not be pickled, or the process died)
+        results.extend([(exc, None)] * len(chunk) if exc else chunk_future.result())
+    if not any(exc for exc, _ in results):
+        return [result for _, result in results]
+
+    futures = Futures(_completed_future(ctx, funcname, exc, result) for (args, ctx), (exc, result) in zip(items, results))
+    return futures.result()
+
+
+def _completed_future(ctx, funcname, exception=None, result=None):
+    "Helper for creating a completed future, with the information that ``_submit_execution`` attaches to futures"
+    future = Future()
+    future.ctx = ctx
+    future.funcname = funcname
+    if exception:
+        future.set_exception(exception)
+    else:
+        future.set_result(result)
+    return future
+
+
+def concurrent_imap(func, params, workers=None, log_contexts=None, initial_log_interval=None, ordered=False,
+                    max_in_flight=None, **kw):
+    """
+    Like ``concurrent_map``, but yields ``(param, result)`` pairs as soon as each call completes.
+    Failed calls yield their exception instead of a result, so that the rest of the results are not lost.
+
+    ``params`` (and ``log_contexts``) can be any iterable, even an endless one. It is consumed lazily,
+    keeping at most ``max_in_flight`` calls (default: twice the ``workers``) submitted but not yet yielded,
+    so memory use does not depend on the number of items.
+    Stopping the iteration cancels the calls that did not start yet, and the ``CancellationToken`` of those that did
+    (see ``asynchronous``).
+
+    :param workers: The number of workers to use (default: ``MAX_THREAD_POOL_SIZE``), or ``'adaptive'``
+                    (see ``asynchronous``).
+    :param ordered: Yield the results in the order of ``params``, rather than in order of completion.
+    """
+    params, params_for_args = tee(params)
+    args_list, args_for_ctx = tee(_iter_args(params_for_args))
+    tasks = zip(params, args_list, _to_log_contexts(args_for_ctx, log_contexts))
+    cancellation_token = CancellationToken()
+    if _takes_param(func, '_cancel') and '_cancel' not in kw:
+        kw['_cancel'] = cancellation_token
+
+    if DISABLE_CONCURRENCY:
+        for param, args, ctx in tasks:
+            try:
+                yield param, _run_with_exception_logging(func, args, kw, ctx)
+            except Exception as exc:
+                yield param, exc
+        return
+
+    adaptive = workers == 'adaptive'
+    if adaptive:
+        workers = None
+    workers = workers or MAX_THREAD_POOL_SIZE
+    max_in_flight = max_in_flight or 2 * workers
+    dedicated = getattr(_POOLED, 'active', False)
+    if adaptive:
+        adaptive = AdaptiveLimit(max_limit=workers)
+        executor = _PooledExecutor(adaptive, pool=ThreadPoolExecutor(workers) if dedicated else None)
+    else:
+        executor = ThreadPoolExecutor(workers) if dedicated else _PooledExecutor(workers)
+    funcname = _get_func_name(func)
+    func = cancellation_token.bind(func)
+    pending = Futures()  # in order of submission
+    completed_count = 0
+    log_interval = initial_log_interval
+    global_timer = Timer()
+    iteration = 0
+
+    try:
+        while True:
+            for param, args, ctx in islice(tasks, max_in_flight - len(pending)):
+                future = _submit_execution(executor, func, args, kw, ctx=ctx, funcname=funcname)
+                future.param = param
+                if adaptive:
+                    future.add_done_callback(adaptive.track)
+                pending.append(future)
+            if not pending:
+                break
+
+            if not futures_wait(pending[:1] if ordered else pending, timeout=log_interval,
+                                return_when=FIRST_COMPLETED).done:
+                iteration += 1
+                if iteration % 5 == 0:
+                    log_interval *= 5
+                pending._log_pending(list(pending), global_timer, total=completed_count + len(pending))
+                continue
+
+            if ordered:
+                done = list(takewhile(lambda f: f.done(), pending))
+            else:
+                done = [f for f in pending if f.done()]
+            for future in done:
+                pending.remove(future)
+                completed_count += 1
+                yield future.param, future.exception() or future.result()
+    finally:
+        pending.cancel()
+        cancellation_token.cancel()
+        executor.shutdown(wait=False)
+
+
+def concurrent_map(func, params, workers=None, log_contexts=None, initial_log_interval=None, backend='thread',
+                   chunksize=None, cost_key=None, progress=None, rate=None, burst=1, **kw):
+    """
+    Concurrently map the list of tuple-parameters onto ``func``, returning the list of results.
+    Raises a ``MultiException`` if one or more of the calls failed.
+
+    :param workers: The number of workers to use, or ``'adaptive'`` for adapting it to the latencies and failures of
+                    the calls (see ``asynchronous``).
+    :param backend: ``'thread'``, or ``'process'`` for CPU-bound functions (see ``_chunked_map``)
+    :param chunksize: The number of calls sent to a worker at a time, for reducing the overhead of many short calls.
+                      The calls then log under the context of their chunk, rather than their own.
+                      Always used with the ``'process'`` backend.
+    :param cost_key: Dispatch the calls longest-first (see ``asynchronous``).
+    :param progress: A callback for reporting the throughput, latencies and ETA, or ``True`` for showing them on the
+                     progress bar (see ``Futures.logged_wait``). Not used with ``chunksize`` or processes.
+    :param rate: Limit the calls per second, with bursts of up to ``burst`` calls (see ``asynchronous``).
+    """
+    rate_limiter = _to_rate_limiter(rate, burst)
     if DISABLE_CONCURRENCY or len(params) == 1:
+        if rate_limiter:
+            func = _rate_limited(func, rate_limiter)
         return nonconcurrent_map(func, params, log_contexts, **kw)
 
-    with asynchronous(func, list(params), workers, log_contexts, **kw) as futures:
-        futures.logged_wait(initial_log_interval=initial_log_interval)
+    assert backend in ('thread', 'process'), "backend must be either 'thread' or 'process' (got %r)" % (backend,)
+    if chunksize or backend == 'process':
+        assert not rate_limiter, "rate limiting is not supported with chunksize or processes"
+        assert workers != 'adaptive', "adaptive workers are not supported with chunksize or processes"
+        return _chunked_map(func, list(params), workers, log_contexts, initial_log_interval, chunksize, backend, **kw)
+
+    with asynchronous(func, list(params), workers, log_contexts, cost_key=cost_key, rate=rate_limiter, **kw) as futures:
+        futures.logged_wait(initial_log_interval=initial_log_interval, progress=progress)
         return futures.result()
 
 
@@ -712,10 +1607,13 @@ class MultiObject(object, metaclass=MultiObjectMeta):
 
     CONCESTOR = object
 
-    def __init__(self, items=None, log_ctx=None, workers=None, initial_log_interval=None):
+    def __init__(self, items=None, log_ctx=None, workers=None, initial_log_interval=None, backend='thread'):
         self._items = tuple(items) if items else ()
         self._workers = workers
         self._initial_log_interval = initial_log_interval
+        self._backend = backend
+        self._cost_key = None
+        self._rate_limiter = None
         cstr = self.CONCESTOR
         if hasattr(cstr, '_multiobject_log_ctx'):
             # override the given log_ctx if the new items have it
@@ -723,13 +1621,16 @@ class MultiObject(object, metaclass=MultiObjectMeta):
             # on the base class
             self._log_ctx = tuple(item._multiobject_log_ctx for item in self._items)
         elif callable(log_ctx):
-            self._log_ctx = tuple(map(log_ctx, self._items))
+            self._log_ctx = _LazyLogContexts(self._items, lambda i, item: log_ctx(item))
+        elif isinstance(log_ctx, _LazyLogContexts):
+            self._log_ctx = log_ctx  # from the MultiObject we were made from
         elif log_ctx:
             self._log_ctx = tuple(log_ctx)
         elif issubclass(cstr, str):
-            self._log_ctx = tuple(dict(context="%s" % item) for item in self._items)
+            self._log_ctx = _LazyLogContexts(self._items, lambda i, item: dict(context="%s" % item))
         else:
-            self._log_ctx = tuple(dict(context="%s<M%03d>" % (cstr.__name__, i)) for i, item in enumerate(self._items))
+            name = cstr.__name__
+            self._log_ctx = _LazyLogContexts(self._items, lambda i, item: dict(context="%s<M%03d>" % (name, i)))
 
         if self._workers is None and hasattr(cstr, '_multiobject_workers'):
             _workers = cstr._multiobject_workers
@@ -782,7 +1683,9 @@ class MultiObject(object, metaclass=MultiObjectMeta):
             do_it, self,
             log_contexts=self._log_ctx,
             workers=self._workers,
-            initial_log_interval=initial_log_interval)
+            initial_log_interval=initial_log_interval,
+            cost_key=self._cost_key,
+            rate=self._rate_limiter)
         return self._new(ret)
 
     def __dir__(self):
@@ -801,15 +1704,48 @@ class MultiObject(object, metaclass=MultiObjectMeta):
         return self.call(lambda i: i[key])
 
     def _new(self, items=None, ctxs=None, workers=None, initial_log_interval=None):
-        return MultiObject(
+        mo = MultiObject(
             self._items if items is None else items,
             self._log_ctx if ctxs is None else ctxs,
             self._workers if workers is None else workers,
             self._initial_log_interval if initial_log_interval is None else initial_log_interval)
+        mo._rate_limiter = self._rate_limiter
+        mo._cost_key = self._cost_key
+        return mo
 
-    def with_workers(self, workers):
-        "Return a new ``MultiObject`` based on current items with the specified number of workers"
-        return self._new(workers=workers)
+    def with_workers(self, workers, cost_key=None):
+        """
+        Return a new ``MultiObject`` based on current items with the specified number of workers.
+        With ``cost_key``, its calls are dispatched longest-first (see ``asynchronous``). A ``cost_key`` function
+        is applied to the current items, so the costs also apply to calls made through attribute access.
+        """
+        mo = self._new(workers=workers)
+        mo._cost_key = [cost_key(item) for item in self._items] if callable(cost_key) else cost_key
+        return mo
+
+    def with_rate_limit(self, rate, burst=1):
+        """
+        Return a new ``MultiObject`` based on current items, whose calls are limited to ``rate`` calls per second,
+        with bursts of up to ``burst`` calls. ``rate`` can also be a ``RateLimiter``, or the name of a shared one
+        (see ``get_rate_limiter``)::
+
+            get_rate_limiter("api", rate=100)
+            statuses = servers.with_rate_limit("api").get_status()
+        """
+        mo = self._new()
+        mo._rate_limiter = _to_rate_limiter(rate, burst)
+        return mo
+
+    def with_processes(self, workers=None):
+        """
+        Return a new ``MultiObject`` based on current items, whose ``call`` (and ``filter``) runs in a pool of
+        ``workers`` processes (default: the number of CPUs), for CPU-bound functions.
+        The function, items and results must be picklable. The ``MultiObject`` objects it returns use threads again.
+        """
+        mo = self._new()
+        mo._workers = workers
+        mo._backend = 'process'
+        return mo
 
     def call(self, func, *args, **kw):
         "Concurrently call a function on each of the object contained by this ``MultiObject`` (as first param)"
@@ -821,16 +1757,38 @@ class MultiObject(object, metaclass=MultiObjectMeta):
             func, params,
             log_contexts=self._log_ctx,
             workers=self._workers,
-            initial_log_interval=initial_log_interval), initial_log_interval=initial_log_interval)
+            initial_log_interval=initial_log_interval,
+            backend=self._backend,
+            cost_key=self._cost_key,
+            rate=self._rate_limiter), initial_log_interval=initial_log_interval)
 
     each = call
 
+    def iter_call(self, func, *args, **kw):
+        """
+        Like ``call``, but yields ``(obj, result)`` pairs in order of completion, as soon as each call completes,
+        where ``result`` is the exception raised by the call if it failed (see ``concurrent_imap``).
+        """
+        initial_log_interval = kw.pop("initial_log_interval", self._initial_log_interval)
+        if kw:
+            func = wraps(func)(partial(func, **kw))
+        params = [((item,) + args) for item in self]
+        for item_args, result in concurrent_imap(
+                func, params,
+                log_contexts=self._log_ctx,
+                workers=self._workers,
+                initial_log_interval=initial_log_interval):
+            yield item_args[0], result
+
     def filter(self, pred):
         if not pred:
             pred = bool
         filtering = self.call(pred)
         filtered = [t for (*t, passed) in zip(self, self._log_ctx, filtering) if passed]
-        return self._new(*(zip(*filtered) if filtered else ((), ())))
+        mo = self._new(*(zip(*filtered) if filtered else ((), ())))
+        if isinstance(self._cost_key, list):
+            mo._cost_key = [cost for cost, passed in zip(self._cost_key, filtering) if passed]
+        return mo
 
     def chain(self):
         "Chain the iterables contained by this ``MultiObject``"
@@ -869,6 +1827,21 @@ class MultiObject(object, metaclass=MultiObjectMeta):
     def concurrent_find(self, func=lambda f: f(), **kw):
         return concurrent_find(func, self, log_contexts=self._log_ctx, workers=self._workers, **kw)
 
+    def hedged_call(self, func=lambda f: f(), **kw):
+        "Call ``func`` on the objects one after another, until one succeeds in time (see ``hedged_call``)"
+        return hedged_call(func, self, log_contexts=self._log_ctx, **kw)
+
+    def lazy(self):
+        """
+        Return a ``MultiObjectPipeline``, which records a chain of attribute accesses and calls on these objects,
+        and then runs the whole chain on each object as a single concurrent task::
+
+            statuses = servers.lazy().connection.session.get_status().T
+
+        Unlike ``servers.connection.session.get_status()``, which waits for all the servers on every step.
+        """
+        return MultiObjectPipeline(self)
+
     def __enter__(self):
         return self.call(lambda obj: obj.__enter__())
 
@@ -876,19 +1849,99 @@ class MultiObject(object, metaclass=MultiObjectMeta):
         self.call(lambda obj: obj.__exit__(*args))
 
 
+class MultiObjectPipeline(object):
+    """
+    A chain of attribute accesses, item accesses and calls on the objects of a ``MultiObject`` (see ``MultiObject.lazy``),
+    which runs when its results are requested, via ``.M`` (a ``MultiObject``), ``.T`` (a tuple) or ``.L`` (a list).
+    """
+
+    def __init__(self, multiobject, steps=(), description=""):
+        self._multiobject = multiobject
+        self._steps = steps
+        self._description = description
+
+    def __repr__(self):
+        return "<%s (x%s) %s>" % (self.__class__.__name__, len(self._multiobject), self._description or "...")
+
+    def _then(self, step, description):
+        return MultiObjectPipeline(self._multiobject, self._steps + (step,), self._description + description)
+
+    def __getattr__(self, attr):
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return self._then(lambda obj: getattr(obj, attr), "." + attr)
+
+    def __getitem__(self, key):
+        return self._then(lambda obj: obj[key], "[%r]" % (key,))
+
+    def __call__(self, *args, **kwargs):
+        return self._then(lambda obj: obj(*args, **kwargs), "(..)")
+
+    def _run(self, obj):
+        for step in self._steps:
+            obj = step(obj)
+        return obj
+
+    @property
+    def M(self):
+        "Run the pipeline, and return a ``MultiObject`` of its results"
+        mo = self._multiobject
+
+        def run(obj):
+            return self._run(obj)
+        run.__qualname__ = mo.CONCESTOR.__qualname__ + self._description  # for the logs
+
+        return mo._new(concurrent_map(
+            run, mo,
+            log_contexts=mo._log_ctx,
+            workers=mo._workers,
+            initial_log_interval=mo._initial_log_interval))
+
+    @property
+    def T(self):
+        return self.M.T
+
+    @property
+    def L(self):
+        return self.M.L
+
+    def __iter__(self):
+        return iter(self.T)
+
+
+_CONCESTORS = {}  # (cls, ...) -> closest common ancestor
+MAX_CONCESTORS = 1000
+
+
 def concestor(*cls_list):
     "Closest common ancestor class"
-    mros = [list(inspect.getmro(cls)) for cls in cls_list]
+    cls_list = tuple(dict.fromkeys(cls_list))  # unique, in order
+    if len(cls_list) == 1:
+        return cls_list[0]
+    try:
+        return _CONCESTORS[cls_list]
+    except KeyError:
+        pass
+
+    mros = [list(reversed(inspect.getmro(cls))) for cls in cls_list]
     track = defaultdict(int)
-    while mros:
-        for mro in mros:
-            cur = mro.pop(0)
+    common = None
+    while mros and common is None:
+        for mro in list(mros):
+            cur = mro.pop()
             track[cur] += 1
             if track[cur] == len(cls_list):
-                return cur
-            if len(mro) == 0:
+                common = cur
+                break
+            if not mro:
                 mros.remove(mro)
-    return object  # the base-class that rules the all
+
+    if common is None:
+        common = object  # the base-class that rules the all
+    if len(_CONCESTORS) >= MAX_CONCESTORS:
+        _CONCESTORS.clear()
+    _CONCESTORS[cls_list] = common
+    return common
 
 
 class concurrent(object):
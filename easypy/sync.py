@@ -15,6 +15,7 @@ import atexit
 import signal
 import os
 from collections import Counter
+from weakref import WeakSet
 from .bunch import Bunch
 
 import easypy._multithreading_init
@@ -52,6 +53,10 @@ class ProcessExiting(TException):
     template = "Aborting thread - process is exiting"
 
 
+class TaskCancelled(TException):
+    template = "Task cancelled"
+
+
 class TimebombExpired(TException):
     template = "Timebomb Expired - process killed itself"
     exit_with_code = 234
@@ -386,6 +391,146 @@ class TagAlongThread(object):
             self._thread.join()
 
 
+_CANCELLATION_TOKENS = threading.local()
+
+
+def get_cancellation_token():
+    "Return the ``CancellationToken`` installed in the current thread, if any"
+    return getattr(_CANCELLATION_TOKENS, 'current', None)
+
+
+class CancellationToken(object):
+    """
+    A token for cooperatively cancelling work that is already running, such as the tasks of a ``MultiObject``
+    or ``asynchronous`` call that was killed. Tasks that take a ``_cancel`` parameter get the token, the same way
+    ``_sync`` is injected, and can check it::
+
+        def download(url, _cancel):
+            for chunk in iter_chunks(url):
+                _cancel.raise_if_cancelled()
+                ...
+
+    The token is also installed in the thread running the task, so that ``wait`` and ``iter_wait``
+    raise ``TaskCancelled`` as soon as it is cancelled.
+    Tokens created in a thread with an installed token are cancelled along with it.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._children = WeakSet()
+        parent = get_cancellation_token()
+        if parent:
+            parent._children.add(self)
+            if parent.cancelled:
+                self.cancel()
+
+    def __repr__(self):
+        return "<%s%s>" % (self.__class__.__name__, " (cancelled)" if self.cancelled else "")
+
+    def cancel(self):
+        self._event.set()
+        for child in list(self._children):
+            child.cancel()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def wait(self, timeout=None):
+        "Sleep until the token is cancelled or the ``timeout`` passes. Returns ``True`` if it was cancelled"
+        return self._event.wait(timeout)
+
+    def raise_if_cancelled(self):
+        if self.cancelled:
+            raise TaskCancelled()
+
+    @contextmanager
+    def installed(self):
+        "Install this token in the current thread (see ``get_cancellation_token``), for the duration of the context"
+        previous = get_cancellation_token()
+        _CANCELLATION_TOKENS.current = self
+        try:
+            yield self
+        finally:
+            _CANCELLATION_TOKENS.current = previous
+
+    def bind(self, func):
+        "Wrap ``func`` so that it runs with this token installed"
+        @wraps(func)
+        def inner(*args, **kwargs):
+            with self.installed():
+                return func(*args, **kwargs)
+        return inner
+
+
+class RateLimiter(object):
+    """
+    A token-bucket rate limiter, allowing ``rate`` calls per second on average, and bursts of up to ``burst`` calls
+    after being idle (default: 1, for evenly spaced calls)::
+
+        limiter = RateLimiter(rate=10, burst=5)
+        for request in requests:
+            limiter.acquire()
+            send(request)
+
+    ``concurrent_map`` and ``MultiObject`` take a limiter (or a ``rate``) for limiting the calls they dispatch.
+    Limiters shared by name across the process are made with ``get_rate_limiter``.
+    """
+
+    def __init__(self, rate, burst=1):
+        assert rate > 0, "rate must be positive (got %r)" % (rate,)
+        assert burst >= 1, "burst must be at least 1 (got %r)" % (burst,)
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "<%s %s/s (burst=%s)>" % (self.__class__.__name__, self.rate, self.burst)
+
+    def try_acquire(self):
+        "Take a token if one is available, and return 0, or otherwise the number of seconds until one is"
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self):
+        "Wait for a token. Raises ``TaskCancelled`` if the current ``CancellationToken`` is cancelled meanwhile"
+        cancellation_token = get_cancellation_token()
+        while True:
+            delay = self.try_acquire()
+            if not delay:
+                return
+            if cancellation_token:
+                cancellation_token.wait(delay)
+                cancellation_token.raise_if_cancelled()
+            else:
+                time.sleep(delay)
+
+
+_RATE_LIMITERS = {}
+_RATE_LIMITERS_LOCK = threading.Lock()
+
+
+def get_rate_limiter(name, rate=None, burst=1):
+    """
+    Return the ``RateLimiter`` shared under ``name`` (for example, a downstream service), creating it with the given
+    ``rate`` and ``burst`` on first use. Raises ``KeyError`` if there is no such limiter and no ``rate`` was given.
+    """
+    with _RATE_LIMITERS_LOCK:
+        if name not in _RATE_LIMITERS:
+            if rate is None:
+                raise KeyError("No rate limiter named %r" % (name,))
+            _RATE_LIMITERS[name] = RateLimiter(rate, burst)
+        return _RATE_LIMITERS[name]
+
+
 class SynchronizationCoordinatorWrongWait(TException):
     template = "Task is waiting on {this_file}:{this_line} instead of {others_file}:{others_line}"
 
@@ -1020,6 +1165,7 @@ def iter_wait(
 
     l_timer = Timer(expiration=timeout)
     log_timer = Timer(expiration=log_interval)
+    cancellation_token = get_cancellation_token()
 
     with ExitStack() as stack:
         if progressbar:
@@ -1028,6 +1174,8 @@ def iter_wait(
             pr.set_message(msg)
 
         while True:
+            if cancellation_token:
+                cancellation_token.raise_if_cancelled()
             s_timer = Timer()
             expired = l_timer.expired
             last_exc = None
@@ -1075,7 +1223,10 @@ def iter_wait(
                 s_timeout = max(0, sleep_for - s_timer.elapsed)
                 if l_timer.expiration:
                     s_timeout = min(l_timer.remain, s_timeout)
-                time.sleep(s_timeout)
+                if cancellation_token:
+                    cancellation_token.wait(s_timeout)
+                else:
+                    time.sleep(s_timeout)
 
 
 @wraps(iter_wait)
@@ -17,6 +17,13 @@ import threading
 from easypy.humanize import format_thread_stack
 
 from easypy.gevent import main_thread_ident_before_patching, is_module_patched
+
+try:
+    from contextvars import ContextVar
+except ImportError:
+    _TASK_UUID = None  # python < 3.7
+else:
+    _TASK_UUID = ContextVar("easypy_task_uuid", default=None)
 from .bunch import Bunch
 from .collections import ilistify
 
@@ -41,6 +48,27 @@ def get_thread_uuid(thread=None):
     return uuid
 
 
+def get_context_uuid():
+    """
+    Returns the UUID of the current ``asyncio`` task, if it was given one with ``set_task_parent``,
+    or otherwise of the current thread. Thread contexts are kept per this UUID.
+    """
+    uuid = _TASK_UUID and _TASK_UUID.get()
+    return uuid or get_thread_uuid()
+
+
+def set_task_parent(parent_uuid):
+    """
+    Give the current ``asyncio`` task a UUID of its own, as a child of the given UUID, so that it keeps a thread context
+    of its own, which inherits from the parent's. Call it from within the task, so that it doesn't leak to other tasks.
+    Requires python 3.7 (``contextvars``).
+    """
+    uuid = uuid4()
+    UUIDS_TREE[uuid] = parent_uuid
+    _TASK_UUID.set(uuid)
+    return uuid
+
+
 _orig_start_new_thread = _thread.start_new_thread
 
 
@@ -48,7 +76,7 @@ def start_new_thread(target, *args, **kwargs):
     """
     A wrapper for the built in 'start_new_thread' used to capture the parent of each new thread.
     """
-    parent_uuid = get_thread_uuid()
+    parent_uuid = get_context_uuid()
 
     def wrapper(*args, **kwargs):
         thread = threading.current_thread()
@@ -65,6 +93,28 @@ def start_new_thread(target, *args, **kwargs):
 get_parent_uuid = UUIDS_TREE.get
 
 
+@contextmanager
+def reparented(parent_uuid):
+    """
+    Make the current thread a child of the thread with the given UUID, under a new UUID, for the duration of the context.
+    Used by pooled threads, so that the tasks they run inherit the context of the thread that submitted them,
+    as if they were running in a new child thread.
+    """
+    ident = threading.current_thread().ident
+    original_uuid = IDENT_TO_UUID.get(ident)
+    uuid = uuid4()
+    IDENT_TO_UUID[ident] = uuid
+    UUID_TO_IDENT[uuid] = ident
+    UUIDS_TREE[uuid] = parent_uuid
+    try:
+        yield uuid
+    finally:
+        if original_uuid is None:
+            IDENT_TO_UUID.pop(ident, None)
+        else:
+            IDENT_TO_UUID[ident] = original_uuid
+
+
 def get_thread_parent(thread):
     """
     Returns parent thread for the given thread.
@@ -389,7 +439,7 @@ class ThreadContexts():
 
     def _get_context_data(self, thread_uuid=None, combined=False):
         if not thread_uuid:
-            thread_uuid = get_thread_uuid()
+            thread_uuid = get_context_uuid()
 
         ctx = self._context_data.setdefault(thread_uuid, [])
         if not combined:
@@ -1,4 +1,12 @@
 import os
+import sys
+
+collect_ignore = []
+if sys.version_info < (3, 5):
+    collect_ignore.append("test_caching_asyncio.py")  # uses the async/await syntax
+if sys.version_info < (3, 7):
+    collect_ignore.append("test_aio.py")  # easypy.aio requires contextvars
+
 if os.getenv("GEVENT") == "true":
     from easypy.gevent import apply_patch
     apply_patch()
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from easypy.aio import AsyncMultiObject, concurrent_map_async
+from easypy.concurrency import MultiException
+from easypy.logging import get_current_context
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def test_concurrent_map_async():
+    running = []
+    max_running = 0
+
+    async def check(n):
+        nonlocal max_running
+        running.append(n)
+        max_running = max(max_running, len(running))
+        await asyncio.sleep(.01)
+        running.remove(n)
+        return get_current_context()['context']
+
+    contexts = run(concurrent_map_async(check, range(10), workers=3))
+    assert contexts == [[str(n)] for n in range(10)]
+    assert max_running == 3
+
+    assert run(concurrent_map_async(lambda a, b: a + b, [(1, 2), (3, 4)])) == [3, 7]
+
+    async def fail(n):
+        await asyncio.sleep(0)
+        return 1 / n
+
+    with pytest.raises(MultiException[ZeroDivisionError]) as info:
+        run(concurrent_map_async(fail, range(3), log_contexts="abc"))
+    assert info.value.count == 1
+    assert info.value.futures.T[1].result() == 1
+    assert info.value.one.context['context'] == ['a']
+
+
+def test_async_multiobject():
+
+    class Server(object):
+        def __init__(self, n):
+            self.n = n
+            self.session = self
+
+        async def get_status(self, suffix):
+            await asyncio.sleep(.01 * (3 - self.n))
+            return "%s%s" % (self.n, suffix)
+
+    servers = AsyncMultiObject(map(Server, range(3)))
+    assert servers.n.T == (0, 1, 2)
+    statuses = run(servers.session.get_status("!"))
+    assert isinstance(statuses, AsyncMultiObject)
+    assert statuses.T == ("0!", "1!", "2!")
@@ -1,4 +1,5 @@
 import os
+import glob
 import time
 from logging import getLogger
 from uuid import uuid4
@@ -7,9 +8,12 @@ import weakref
 import gc
 
 import pytest
+from functools import partial
+from mock import patch
 
 from easypy.bunch import Bunch
-from easypy.caching import timecache, PersistentCache, cached_property, locking_cache
+from easypy.caching import timecache, PersistentCache, cached_property, locking_cache, _INHERITED_HANDLES
+from easypy.caching import PersistentCache as _PersistentCache, CODECS, iter_caches, get_caches_info
 from easypy.units import DAY
 from easypy.resilience import resilient
 
@@ -143,19 +147,281 @@ def test_timecache_getattr():
     assert foo.bar == [4, 'bar']
 
 
+def test_timecache_maxsize_lru():
+    calls = []
+
+    @timecache(maxsize=2)
+    def get(k):
+        calls.append(k)
+        return k
+
+    get(1)
+    get(2)
+    get(1)  # 2 is now the least recently used
+    get(3)
+    assert calls == [1, 2, 3]
+    assert set(get.cache) == {1, 3}
+    assert set(get.keyed_locks) == {1, 3}
+
+    get(1)
+    get(2)
+    assert calls == [1, 2, 3, 2]
+
+    @timecache(expiration=.01, maxsize=10)
+    def fail_on_odd(k):
+        if k % 2:
+            raise ValueError(k)
+        return k
+
+    for k in range(2000):
+        try:
+            fail_on_odd(k)
+        except ValueError:
+            pass
+    assert len(fail_on_odd.keyed_locks) <= len(fail_on_odd.cache) <= 10  # failed calls don't leave their locks
+
+    with pytest.raises(AssertionError):
+        timecache(maxsize=0)(get)
+
+
+def test_timecache_maxsize_lfu():
+    calls = []
+
+    @locking_cache(maxsize=2, policy='lfu')
+    def get(k):
+        calls.append(k)
+        return k
+
+    get(1)
+    get(1)
+    get(2)
+    get(3)  # 2 is the least frequently used
+    assert set(get.cache) == {1, 3}
+    get(1)
+    assert calls == [1, 2, 3]
+
+    @locking_cache(maxsize=3, policy='lfu')
+    def get(k):
+        return k
+
+    for k in [1, 2, 3, 1, 4]:  # ties are broken by the least recently used
+        get(k)
+    assert set(get.cache) == {1, 3, 4}
+    for k in [3, 5, 5, 5, 6]:
+        get(k)
+    assert set(get.cache) == {3, 5, 6}
+    get.cache_pop(5)
+    for k in [7, 8]:
+        get(k)
+    assert set(get.cache) == {3, 7, 8}
+
+    with pytest.raises(AssertionError):
+        timecache(policy='fifo')(get)
+
+
+def test_timecache_sweeps_expired():
+    ts = 0
+
+    @timecache(expiration=1, get_ts_func=lambda: ts)
+    def get(k):
+        return k
+
+    for k in range(10):
+        get(k)
+    assert len(get.cache) == 10
+
+    ts += 1
+    get('new')
+    assert list(get.cache) == ['new']
+    assert list(get.keyed_locks) == ['new']
+
+
+def test_timecache_cache_info():
+    ts = 0
+
+    @timecache(expiration=1, get_ts_func=lambda: ts, maxsize=2)
+    def get(k):
+        return k
+
+    get(1)
+    get(1)
+    get(2)
+    get(3)  # evicts 1
+    ts += 1
+    get(3)  # expired, and 2 is swept
+
+    info = get.cache_info()
+    assert info.name.endswith("get")
+    assert (info.hits, info.misses, info.expirations, info.evictions, info.currsize) == (1, 4, 2, 1, 1)
+    assert info.compute_time >= 0
+    assert info in get_caches_info()
+    assert get in set(iter_caches())
+
+    get.cache_info_clear()
+    assert get.cache_info().misses == 0
+
+
+def test_cached_property_cache_info():
+    class A():
+        @cached_property
+        def a(self):
+            return 1
+
+    a = A()
+    assert a.a == a.a == 1
+    info = A.a.cache_info()
+    assert info.misses == 1
+    assert info.currsize is None
+
+
+def test_timecache_key_builder():
+    from easypy.caching import _compile_key_builder
+
+    def func(a, b=2, *, x=None, y=3):
+        pass
+
+    def func_variadic(a, b=2, *args, x=None, y=3, **kw):
+        pass
+
+    make_key = _compile_key_builder(func, ignored_keywords={'x'})
+    make_key_slow = _compile_key_builder(func_variadic, ignored_keywords={'x', 'args', 'kw'})
+    for args, kwargs in [((1,), {}), ((1, 2), dict(x=5)), ((), dict(a=1, y=3)), ((1,), dict(b=2, x=0))]:
+        assert make_key(args, kwargs) == make_key_slow(args, kwargs) == (1, 2, 3)
+
+    for args, kwargs in [((), {}), ((1,), dict(a=1)), ((1, 2, 3), {}), ((1,), dict(z=1))]:
+        with pytest.raises(TypeError):
+            make_key(args, kwargs)
+
+    make_key = _compile_key_builder(func, key_func=lambda a, y: (a, y))
+    assert make_key((1,), dict(x=2)) == (1, 3)
+
+    make_key = _compile_key_builder(func, key_func=lambda **kw: tuple(kw.items()))
+    key = make_key((1, 2), dict(y=3, x=4))
+    assert key == make_key((), dict(y=3, x=4, b=2, a=1)) == (('a', 1), ('b', 2), ('x', 4), ('y', 3))
+
+    @timecache(key_func=lambda **kw: tuple(kw.items()))
+    def f(a, b, c):
+        calls.append((a, b, c))
+
+    calls = []
+    f(1, 2, 3)
+    f(c=3, b=2, a=1)
+    assert calls == [(1, 2, 3)]
+
+
+@pytest.mark.parametrize('lock_stripes', [None, 8])
+def test_timecache_concurrent_hits(lock_stripes):
+    from easypy.concurrency import MultiObject
+    from easypy.timing import Timer
+
+    calls = []
+
+    @timecache(lock_stripes=lock_stripes)
+    def get(k):
+        calls.append(k)
+        return k * 2
+
+    def locking_get(k):
+        # a copy of the lookup before hits became lock-free, for comparison
+        key = get.make_key((k,), {})
+        with get.main_lock:
+            key_lock = get.keyed_locks[key]
+        with key_lock:
+            result, ts = get.cache.get(key, get.NOT_CACHED)
+            return result
+
+    def hammer(k, get=get):
+        return [get(i % 16) for i in range(k, k + 2000)]
+
+    for k in range(16):
+        get.cache[k] = k * 2, 0
+
+    timer = Timer()
+    MultiObject(range(64), workers=64).call(hammer, get=locking_get)
+    locking_duration = timer.stop()
+
+    get.main_lock.acquire()  # hits on populated entries must not need the main lock
+    try:
+        timer = Timer()
+        results = MultiObject(range(64), workers=64).call(hammer)
+        duration = timer.stop()
+    finally:
+        get.main_lock.release()
+
+    # only logged, since wall-clock comparisons are too noisy to assert on
+    _logger.info("%s concurrent hits (lock_stripes=%s) in %.3fs, vs. %.3fs with locking",
+                 64 * 2000, lock_stripes, duration, locking_duration)
+    assert all(r == [(i % 16) * 2 for i in range(k, k + 2000)] for k, r in zip(range(64), results))
+    assert not calls
+
+    get.cache_clear()
+    assert MultiObject(range(64)).call(get).T == tuple(k * 2 for k in range(64))
+    assert sorted(calls) == list(range(64))
+
+
+def test_timecache_stale_while_revalidate():
+    from easypy.sync import wait
+
+    ts = 0
+    calls = []
+
+    @timecache(expiration=10, stale_while_revalidate=5, get_ts_func=lambda: ts)
+    def get():
+        calls.append(ts)
+        return len(calls)
+
+    assert get() == 1
+
+    ts = 11
+    assert get() == 1  # stale, while being refreshed in the background
+    wait(1, lambda: not get.refreshing, sleep=.01, message=False)
+    assert get() == 2
+    assert calls == [0, 11]
+
+    ts = 30  # beyond the stale window
+    assert get() == 3
+    assert calls == [0, 11, 30]
+
+
+def test_timecache_refresh_ahead():
+    from easypy.sync import wait
+
+    ts = 0
+    calls = []
+
+    @timecache(expiration=10, refresh_ahead=0.5, get_ts_func=lambda: ts)
+    def get():
+        calls.append(ts)
+        return len(calls)
+
+    assert get() == 1
+    ts = 4
+    assert get() == 1
+    assert calls == [0]
+
+    ts = 6
+    assert get() == 1  # still fresh, but refreshed ahead of expiration
+    wait(1, lambda: not get.refreshing, sleep=.01, message=False)
+    assert calls == [0, 6]
+    assert get() == 2
+
+    with pytest.raises(AssertionError):
+        timecache(refresh_ahead=0.5)(get)
+
+
 @pytest.yield_fixture()
 def persistent_cache_path():
     cache_path = '/tmp/test_pcache_%s' % uuid4()
     try:
         yield cache_path
     finally:
-        try:
-            os.unlink("%s.db" % cache_path)
-        except:
-            pass
+        for path in glob.glob("%s*" % cache_path):
+            os.unlink(path)
 
 
-def test_persistent_cache(persistent_cache_path):
+@pytest.mark.parametrize('backend', ['shelve', 'sqlite'])
+def test_persistent_cache(persistent_cache_path, backend):
+    PersistentCache = partial(_PersistentCache, backend=backend)
     ps = PersistentCache(persistent_cache_path, version=1)
     TEST_KEY = "test_key"
     TEST_VALUE = "test_value"
@@ -209,6 +475,201 @@ def test_persistent_cache(persistent_cache_path):
     assert ps.get(TEST_KEY, None) is None, "Database was not cleaned up on expiration"
 
 
+def test_persistent_cache_sqlite_multiprocess(persistent_cache_path):
+    import multiprocessing
+
+    ps = PersistentCache(persistent_cache_path, backend='sqlite')
+    ps.set("parent", 0)  # the children inherit an open connection
+
+    def write(i):
+        for j in range(50):
+            ps.set("%s-%s" % (i, j), (i, j))
+
+    processes = [multiprocessing.Process(target=write, args=(i,)) for i in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+    assert ps.get("parent") == 0
+    assert all(ps.get("%s-%s" % (i, j)) == (i, j) for i in range(4) for j in range(50))
+
+
+@pytest.mark.parametrize('backend', ['shelve', 'sqlite'])
+def test_persistent_cache_purge_expired(persistent_cache_path, backend):
+    ps = PersistentCache(persistent_cache_path, expiration=.01, backend=backend)
+    ps.set("a", 1)
+    ps.set("b", 2)
+    time.sleep(.011)
+    ps.set("c", 3)
+    assert ps.purge_expired() == 2
+    assert ps.get("c") == 3
+    assert ps.purge_expired() == 0
+
+
+@pytest.mark.parametrize('backend', ['shelve', 'sqlite'])
+def test_persistent_cache_ttl(persistent_cache_path, backend):
+    ps = PersistentCache(persistent_cache_path, expiration=None, backend=backend)
+    calls = []
+
+    @ps(ttl=.01)
+    def short_lived(n):
+        calls.append(n)
+        return n
+
+    @ps
+    def long_lived(n):
+        calls.append(n)
+        return n
+
+    assert short_lived(1) == 1
+    assert long_lived(2) == 2
+    time.sleep(.011)
+    short_lived(1)
+    long_lived(2)
+    assert calls == [1, 2, 1]
+
+    ps.set("a", 1, ttl=.01)
+    time.sleep(.011)
+    assert ps.get("a", None) is None
+
+
+@pytest.mark.parametrize('backend', ['shelve', 'sqlite'])
+def test_persistent_cache_eviction(persistent_cache_path, backend):
+    ps = PersistentCache(persistent_cache_path, backend=backend, max_entries=3)
+    for i in range(5):
+        ps.set(str(i), i)
+        time.sleep(.001)  # make sure access times differ
+    assert ps.evict() == 2
+    assert [ps.get(str(i), None) for i in range(5)] == [None, None, 2, 3, 4]
+
+    if backend == 'sqlite':
+        statements = []
+        with ps.backend.db_opened() as conn:
+            conn.set_trace_callback(statements.append)
+        ps.get("2")  # only the SQLite backend tracks reads
+        assert not [s for s in statements if s.startswith("UPDATE")]  # written in a batch, when evicting
+        time.sleep(.001)
+    ps.set("5", 5)
+    if backend == 'shelve':
+        import shelve
+        read = []
+        shelf_getitem = shelve.Shelf.__getitem__
+        with patch.object(shelve.Shelf, '__getitem__', lambda db, key: read.append(key) or shelf_getitem(db, key)):
+            assert ps.evict() == 1
+        assert read and all(key.startswith(ps.backend.META_PREFIX) for key in read)  # not the payloads
+        assert ps.backend.count() == 3
+    else:
+        assert ps.evict() == 1
+    assert ps.get("3" if backend == 'sqlite' else "2", None) is None
+
+    ps = PersistentCache(persistent_cache_path, backend=backend, max_bytes=2000)
+    ps.clear()
+    for i in range(10):
+        ps.set(str(i), "x" * 500)
+        time.sleep(.001)
+    assert ps.vacuum() >= 6
+    assert sum(ps.get(str(i), None) is not None for i in range(10)) <= 4
+    assert ps.get("9") == "x" * 500
+
+
+@pytest.mark.parametrize('backend', ['shelve', 'sqlite'])
+@pytest.mark.parametrize('codec', sorted(CODECS))
+def test_persistent_cache_codecs(persistent_cache_path, backend, codec):
+    ps = PersistentCache(persistent_cache_path, backend=backend, codec=codec, hashed_keys=True)
+    calls = []
+
+    @ps
+    def get(n, extra=None):
+        calls.append(n)
+        return dict(n=n, items=[1, 2.5, "three", None])
+
+    assert get(1) == get(1) == dict(n=1, items=[1, 2.5, "three", None])
+    assert get(1, extra=2) == get(1, extra=2)
+    assert calls == [1, 1]
+    assert len(ps.make_key(get, (1,), {})) == 40
+
+
+def test_persistent_cache_hashed_keys_stable(persistent_cache_path):
+    import sys
+    import subprocess
+
+    ps = PersistentCache(persistent_cache_path, hashed_keys=True)
+
+    word = 'ababab'
+    assert ps.make_key(len, (word, word), {}) == ps.make_key(len, (word, ''.join(['abab', 'ab'])), {})
+    assert ps.make_key(len, ({1, 'a'},), dict(x=1, y=2)) == ps.make_key(len, (frozenset(['a', 1]),), dict(y=2, x=1)) \
+        != ps.make_key(len, (frozenset(['a', 1]),), dict(y=1, x=2))
+
+    code = (
+        "from easypy.caching import PersistentCache\n"
+        "ps = PersistentCache('%s', hashed_keys=True)\n"
+        "print(ps.make_key(len, ({'a', 'b', 'c', 'd', 'e'}, {'x': {'y', 'z'}, 'w': ('u', 'v')}), {'k': 'v'}))\n"
+        % persistent_cache_path)
+    keys = set()
+    for seed in ['1', '2', '3', '4']:
+        env = dict(os.environ, PYTHONHASHSEED=seed, PYTHONPATH=os.path.dirname(os.path.dirname(__file__)))
+        keys.add(subprocess.check_output([sys.executable, '-c', code], env=env).strip())
+    assert len(keys) == 1
+
+
+def test_persistent_cache_ignores_old_entries(persistent_cache_path):
+    import shelve
+
+    ps = PersistentCache(persistent_cache_path)
+    db = shelve.open(ps.path)
+    db["old"] = ("value", time.time())
+    db.close()
+
+    assert ps.get("old", None) is None
+    ps.set("old", "new value")
+    assert ps.get("old") == "new value"
+
+
+@pytest.mark.parametrize('keep_open', [False, True])
+def test_persistent_cache_latency(persistent_cache_path, keep_open):
+    from easypy.timing import Timer
+
+    ps = PersistentCache(persistent_cache_path, keep_open=keep_open)
+
+    @ps
+    def square(n):
+        return n * n
+
+    misses = Timer()
+    assert [square(n) for n in range(100)] == [n * n for n in range(100)]
+    misses.stop()
+
+    hits = Timer()
+    for _ in range(10):
+        assert [square(n) for n in range(100)] == [n * n for n in range(100)]
+    hits.stop()
+
+    _logger.info("keep_open=%s: miss latency %.1fus, hit latency %.1fus",
+                 keep_open, misses.duration * 1e4, hits.duration * 1e3)
+    ps.close()
+
+
+def test_persistent_cache_keep_open(persistent_cache_path):
+    ps = PersistentCache(persistent_cache_path, keep_open=True)
+    ps.set("a", 1)
+    db = ps.backend._db
+    assert ps.get("a") == 1
+    assert ps.backend._db is db
+
+    ps.backend._db_pid = -1  # pretend we were forked
+    assert ps.get("a") == 1
+    assert ps.backend._db is not db
+    assert db in _INHERITED_HANDLES
+    _INHERITED_HANDLES.remove(db)
+    db.close()
+
+    ps.close()
+    assert ps.backend._db is None
+    assert PersistentCache(persistent_cache_path).get("a") == 1
+
+
 def test_locking_timecache():
     from easypy.concurrency import MultiObject
 
@@ -273,3 +734,18 @@ def test_resilient_between_timecaches():
         raise ExceptionLeakedThroughResilient()
 
     assert foo() == 'default'
+
+
+def test_persistent_cache_info(persistent_cache_path):
+    ps = PersistentCache(persistent_cache_path, version=1)
+
+    @ps
+    def get(k):
+        return k
+
+    get(1)
+    get(1)
+    get(2)
+    info = ps.cache_info()
+    assert info.name.startswith(persistent_cache_path)
+    assert (info.hits, info.misses, info.currsize) == (1, 2, 2)
@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+from easypy.caching import timecache, locking_cache, cached_property
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def test_timecache_coroutine():
+    ts = 0
+    calls = []
+
+    @timecache(expiration=1, get_ts_func=lambda: ts)
+    async def get(k):
+        calls.append(k)
+        await asyncio.sleep(.01)
+        return k * 2
+
+    async def main():
+        nonlocal ts
+        # concurrent misses share a single calculation
+        assert await asyncio.gather(*[get(1) for _ in range(10)]) == [2] * 10
+        assert await get(1) == 2
+        assert calls == [1]
+
+        ts += 1
+        assert await get(1) == 2
+        assert calls == [1, 1]
+
+    run(main())
+
+
+def test_locking_cache_coroutine_failure():
+    calls = []
+
+    @locking_cache
+    async def get(k):
+        calls.append(k)
+        await asyncio.sleep(.01)
+        if len(calls) == 1:
+            raise ValueError(k)
+        return k
+
+    async def main():
+        results = await asyncio.gather(get(1), get(1), return_exceptions=True)
+        assert [type(r) for r in results] == [ValueError, ValueError]
+        assert await get(1) == 1  # failures are not cached
+        assert await get(1) == 1
+        assert calls == [1, 1]
+
+    run(main())
+
+
+def test_timecache_coroutine_cancelled_awaiter():
+    @timecache()
+    async def get():
+        await asyncio.sleep(.05)
+        return 1
+
+    async def main():
+        first = asyncio.ensure_future(get())
+        second = asyncio.ensure_future(get())
+        await asyncio.sleep(.01)
+        first.cancel()
+        assert await second == 1
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+    run(main())
+
+
+def test_timecache_coroutine_method():
+    class Foo:
+        def __init__(self, prefix):
+            self.prefix = prefix
+
+        @timecache()
+        async def get(self, k):
+            return self.prefix, k
+
+    async def main():
+        foo1, foo2 = Foo(1), Foo(2)
+        assert await foo1.get(1) == (1, 1)
+        assert await foo2.get(1) == (2, 1)
+        assert await foo1.get(1) is await foo1.get(1)
+
+    run(main())
+
+
+def test_cached_property_coroutine():
+    calls = []
+
+    class Foo:
+        @cached_property
+        async def value(self):
+            calls.append(1)
+            await asyncio.sleep(.01)
+            if len(calls) == 1:
+                raise ValueError()
+            return 42
+
+    async def main():
+        foo = Foo()
+        with pytest.raises(ValueError):
+            await foo.value
+        assert await foo.value == 42  # recomputed after the failure
+        assert await foo.value == 42
+        assert len(calls) == 2
+
+    run(main())
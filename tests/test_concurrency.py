@@ -1,8 +1,10 @@
 from mock import patch, call
 import pytest
 from time import sleep
+from concurrent.futures import wait as futures_wait
 
 from easypy.threadtree import get_thread_stacks, ThreadContexts
+from easypy.timing import Timer
 from easypy.concurrency import concurrent, MultiObject, MultiException
 
 
@@ -259,6 +261,40 @@ def test_multiobject_types():
     assert isinstance(MultiObject[str]("123").call(int), MultiObject[int])
 
 
+def test_concestor():
+    from easypy.concurrency import concestor
+
+    class A(): ...
+    class B(A): ...
+    class C(A): ...
+    class D(B): ...
+
+    assert concestor(D, D, D) is D
+    assert concestor(B, D, D) is B
+    assert concestor(D, C) is concestor(D, C, D) is A
+    assert concestor(D, int) is object
+    assert concestor() is object
+
+
+def test_multiobject_lazy_log_contexts():
+    from easypy.logging import THREAD_LOGGING_CONTEXT
+
+    m = MultiObject(["a", "b"])
+    assert list(m._log_ctx) == [dict(context="a"), dict(context="b")]
+
+    m = MultiObject([1.5, 2.5]).call(int)
+    assert m._new()._log_ctx is m._log_ctx  # not made again after each fan-out
+    assert m._log_ctx[-1] == dict(context="float<M001>")
+    assert m.call(lambda i: THREAD_LOGGING_CONTEXT.context[-1]).T == ("float<M000>", "float<M001>")
+
+    made = []
+    m = MultiObject(["a", "b"], log_ctx=lambda item: made.append(item) or dict(context=item))
+    m.call(str)
+    m.call(str)
+    assert m[:].L == ["a", "b"]
+    assert made == ["a", "b"]  # each context is made once
+
+
 def test_multiobject_namedtuples():
     from collections import namedtuple
 
@@ -316,3 +352,498 @@ def test_multiexception_types():
 
     with pytest.raises(MultiException[OK]):
         MultiObject([OKBAD]).call(raise_it)
+
+
+def test_multiobject_shared_thread_pool():
+    import threading
+    from easypy.concurrency import set_max_thread_pool_size, MAX_THREAD_POOL_SIZE
+
+    get_ident = lambda i: threading.get_ident()
+    m = MultiObject(range(4))
+    idents = set(m.call(get_ident))
+    for _ in range(5):
+        idents.update(m.call(get_ident))
+    assert len(idents) <= MAX_THREAD_POOL_SIZE
+    assert threading.get_ident() not in idents
+
+    running = []
+    max_running = 0
+
+    def track(i):
+        nonlocal max_running
+        running.append(i)
+        max_running = max(max_running, len(running))
+        sleep(.02)
+        running.remove(i)
+
+    MultiObject(range(10), workers=2).call(track)
+    assert max_running <= 2
+
+    try:
+        set_max_thread_pool_size(2)
+        # nested calls get their own threads, so they don't deadlock on the (exhausted) pool
+        ret = MultiObject(range(2)).call(lambda i: MultiObject(range(3)).call(lambda j: i * j).T)
+        assert ret.T == ((0, 0, 0), (0, 1, 2))
+    finally:
+        set_max_thread_pool_size(MAX_THREAD_POOL_SIZE)
+
+
+def test_multiobject_workers_beyond_thread_pool(monkeypatch):
+    import threading
+    from easypy import concurrency
+    from easypy.concurrency import MAX_THREAD_POOL_SIZE, asynchronous, concurrent_find, _get_thread_pool
+    from easypy.sync import wait
+
+    workers = MAX_THREAD_POOL_SIZE + 10
+    barrier = threading.Barrier(workers, timeout=5)
+    MultiObject(range(workers), workers=workers).call(lambda i: barrier.wait())
+
+    # concurrent callers don't wait on each other's tasks
+    barriers = [threading.Barrier(MAX_THREAD_POOL_SIZE // 2 + 1, timeout=5) for _ in range(2)]
+    MultiObject(barriers).call(lambda b: MultiObject([b] * b.parties, workers=b.parties).call(lambda b: b.wait()))
+
+    # a call with idle workers doesn't hold threads of the pool
+    release = threading.Event()
+    pool = _get_thread_pool()
+    with asynchronous(lambda i: release.wait(5), [1]) as futures:
+        sleep(.05)
+        assert concurrency._THREAD_POOL_RESERVED == 1
+        release.set()
+    assert concurrency._THREAD_POOL_RESERVED == 0
+
+    # ending a call early leaves the pool alone
+    assert concurrent_find(lambda i: i == 3 or sleep(.1), range(5)) is True
+    assert _get_thread_pool() is pool
+    wait(.5, lambda: concurrency._THREAD_POOL_RESERVED == 0, sleep=.01, message=False)  # the other calls completed
+
+    # killed tasks that don't stop keep their threads, but the pool gets threads in their stead
+    monkeypatch.setattr(concurrency, 'KILLED_TASKS_GRACE_PERIOD', .05)
+    release.clear()
+    with asynchronous(lambda i: release.wait(5), list(range(2))) as futures:
+        sleep(.05)
+        futures.kill()
+    assert concurrency._THREAD_POOL_RESERVED == 2
+    wait(.5, lambda: concurrency._THREAD_POOL_RESERVED == 0, sleep=.01, message=False)
+    assert pool._max_workers == MAX_THREAD_POOL_SIZE + 2
+    barrier = threading.Barrier(MAX_THREAD_POOL_SIZE, timeout=5)
+    MultiObject(range(MAX_THREAD_POOL_SIZE)).call(lambda i: barrier.wait())
+    assert _get_thread_pool() is pool
+    release.set()
+    wait(.5, lambda: pool._max_workers == MAX_THREAD_POOL_SIZE, sleep=.01, message=False)
+
+
+def _square_or_fail(n):
+    import os
+    if n == 3:
+        raise ValueError(n)
+    return n * n, os.getpid()
+
+
+def test_multiobject_with_processes():
+    import os
+    from easypy.concurrency import concurrent_map
+
+    m = MultiObject(range(10), log_ctx="abcdefghij").filter(lambda n: n != 3).with_processes(2)
+    squares, pids = zip(*m.call(_square_or_fail))
+    assert squares == tuple(n * n for n in m)
+    assert os.getpid() not in pids
+
+    with pytest.raises(MultiException[ValueError]) as info:
+        concurrent_map(_square_or_fail, range(5), backend='process', chunksize=2)
+    assert info.value.count == 1
+    assert info.value.exceptions[3].args == (3,)
+    assert info.value.futures.T[3].ctx == dict(context='3')
+
+    assert MultiObject([]).with_processes().call(_square_or_fail).L == []
+    assert concurrent_map(_square_or_fail, [], backend='process') == []
+    assert concurrent_map(_square_or_fail, [], chunksize=2) == []
+
+
+def test_multiobject_lazy():
+    from easypy.bunch import Bunch
+
+    steps = []
+
+    class Server(object):
+        def __init__(self, n):
+            self.n = n
+
+        @property
+        def connection(self):
+            steps.append(("connection", self.n))
+            sleep(.01 * self.n)
+            return Bunch(session=Bunch(get_status=lambda *args: (self.n,) + args))
+
+    m = MultiObject(map(Server, range(5)))
+    pipeline = m.lazy().connection.session.get_status('ok')[1]
+    assert not steps
+    assert "connection.session.get_status(..)[1]" in repr(pipeline)
+    assert pipeline.T == ('ok',) * 5
+    assert isinstance(pipeline.M, MultiObject[str])
+    assert len(steps) == 10
+    assert list(m.lazy().n) == [0, 1, 2, 3, 4]
+
+
+@pytest.mark.usefixtures('concurrency_enabled_and_disabled')
+def test_multiobject_iter_call():
+    from easypy import concurrency
+
+    def check(n):
+        sleep(.05 * n)
+        return 1 / (n - 2)
+
+    m = MultiObject([3, 1, 2, 0])
+    results = list(m.iter_call(check))
+    expected_order = [3, 1, 2, 0] if concurrency.DISABLE_CONCURRENCY else [0, 1, 2, 3]
+    assert [n for n, _ in results] == expected_order
+    results = dict(results)
+    assert results[0] == -0.5 and results[1] == -1 and results[3] == 1
+    assert isinstance(results[2], ZeroDivisionError)
+
+    results = concurrency.concurrent_imap(lambda a, b: a + b, [(1, 2), (3, 4)])
+    assert sorted(results) == [((1, 2), 3), ((3, 4), 7)]
+
+
+def test_concurrent_imap_stragglers():
+    from easypy.concurrency import concurrent_imap
+
+    with patch("easypy.concurrency.Futures.dump_stacks") as dump_stacks:
+        results = concurrent_imap(sleep, [0, .3], initial_log_interval=.1)
+        assert next(results) == (0, None)
+        assert next(results) == (.3, None)
+
+    (pending,), _ = dump_stacks.call_args
+    assert [f.funcname for f in pending] == ['sleep']
+
+
+def test_concurrent_imap_lazy():
+    from itertools import count, islice
+    from easypy.concurrency import concurrent_imap
+
+    consumed = []
+
+    def endless():
+        for n in count():
+            consumed.append(n)
+            yield n
+
+    def double(n):
+        sleep(.01 * (n % 3))
+        return n * 2
+
+    results = concurrent_imap(double, endless(), workers=2, ordered=True)
+    assert list(islice(results, 10)) == [(n, n * 2) for n in range(10)]
+    results.close()
+    assert len(consumed) <= 10 + 4  # at most 2 * workers in flight
+
+
+def test_concurrent_map_chunksize():
+    from easypy.concurrency import concurrent_map
+
+    assert concurrent_map(abs, range(-50, 50), chunksize=7) == [abs(n) for n in range(-50, 50)]
+
+    with pytest.raises(MultiException[ZeroDivisionError]) as info:
+        concurrent_map(lambda n: 1 / n, range(-50, 50), chunksize=7)
+    assert info.value.count == 1
+    assert info.value.invocations_count == 100
+    assert info.value.futures.T[50].ctx == dict(context='0')
+    assert info.value.one.context['context'][-1] == '0'
+
+    tokens = set()
+
+    def check(n, _cancel):
+        _cancel.raise_if_cancelled()
+        tokens.add(_cancel)
+        return n
+
+    assert concurrent_map(check, range(4), chunksize=2) == list(range(4))
+    [token] = tokens
+    assert token.cancelled
+
+    with pytest.raises(AssertionError):
+        concurrent_map(check, range(4), backend='process')
+
+
+def test_hedged_call():
+    from easypy.concurrency import hedged_call, LatencyTracker
+
+    started = []
+    stopped = []
+
+    def read(replica, _cancel):
+        started.append(replica)
+        if replica == 'bad':
+            raise ConnectionError(replica)
+        if _cancel.wait(.5 if replica == "slow" else .05):
+            stopped.append(replica)
+        return replica
+
+    assert hedged_call(read, ['slow', 'fast', 'unused'], delay=.1) == 'fast'
+    assert started == ['slow', 'fast']
+    sleep(.1)
+    assert stopped == ['slow']
+
+    del started[:]
+    assert MultiObject(['bad', 'slow']).hedged_call(read, delay=1) == 'slow'  # failures are hedged immediately
+    assert started == ['bad', 'slow']
+
+    with pytest.raises(MultiException[ConnectionError]):
+        hedged_call(read, ['bad', 'bad'])
+
+    latencies = LatencyTracker(min_samples=3)
+    assert latencies.percentile(95) is None
+    for _ in range(3):
+        hedged_call(read, ['fast', 'slow'], delay=latencies)
+    assert .05 <= latencies.percentile(95) < .5
+
+    del started[:]
+    assert hedged_call(read, ['slow', 'fast'], delay=latencies) == 'fast'
+    assert started == ['slow', 'fast']
+
+    # the default trackers are per function and replicas, so default hedged calls of MultiObjects don't mix
+    from easypy.concurrency import _get_latency_tracker, _get_func_name, MAX_LATENCY_TRACKERS
+    echo = lambda replica: replica
+    MultiObject(['fast', 'slow']).hedged_call(echo)
+    MultiObject(['a', 'b']).hedged_call(echo)
+    ab = _get_latency_tracker(_get_func_name(echo), [dict(context='a'), dict(context='b')])
+    fast_slow = _get_latency_tracker(_get_func_name(echo), [dict(context='fast'), dict(context='slow')])
+    assert ab is not fast_slow
+    assert len(ab._samples) == len(fast_slow._samples) == 1
+    for i in range(MAX_LATENCY_TRACKERS):
+        _get_latency_tracker('test_hedged_call', [dict(context=str(i))])
+    assert _get_latency_tracker(_get_func_name(echo), [dict(context='a'), dict(context='b')]) is not ab
+
+
+def test_cancellation_token():
+    from easypy.concurrency import asynchronous
+    from easypy.sync import wait, TaskCancelled, CancellationToken, get_cancellation_token
+
+    stopped = []
+
+    def work(n, _cancel):
+        assert get_cancellation_token() is _cancel
+        nested = CancellationToken()
+        if n:
+            wait(5, lambda: False, sleep=.01, message=False)  # raises TaskCancelled when killed
+        elif _cancel.wait(5):
+            stopped.append(nested.cancelled)
+
+    timer = Timer()
+    with asynchronous(work, [0, 1], final_timeout=5) as futures:
+        sleep(.1)
+        futures.kill()
+    futures_wait(futures, timeout=5)
+    assert timer.stop() < 1
+    assert stopped == [True]
+    assert isinstance(futures[1].exception(), TaskCancelled)
+
+    assert MultiObject([1]).call(lambda n, _cancel: _cancel.cancelled).T == (False,)
+
+    token = CancellationToken()
+    assert not token.wait(.01)
+    token.cancel()
+    with pytest.raises(TaskCancelled):
+        token.raise_if_cancelled()
+
+
+def test_longest_first_dispatch():
+    from easypy.concurrency import concurrent_map
+
+    durations = [.05, .05, .05, .05, .05, .05, .3]
+
+    def work(duration):
+        started.append(duration)
+        sleep(duration)
+        return duration
+
+    started = []
+    timer = Timer()
+    assert concurrent_map(work, durations, workers=2, cost_key=lambda d: d) == durations
+    assert timer.stop() < .35  # vs. .45 when the long call goes last
+    assert .3 in started[:2]
+
+    mo = MultiObject(durations, log_ctx=[dict(context=str(i)) for i in range(7)]).with_workers(2, cost_key=True)
+    started = []
+    assert mo.call(work).L == durations  # new items go first, in order
+    assert .3 not in started[:2]
+    started = []
+    assert mo.call(work).L == durations  # learned from the previous call
+    assert .3 in started[:2]
+
+    class Job(object):
+        def __init__(self, duration):
+            self.duration = duration
+
+        def run(self):
+            return work(self.duration)
+
+    jobs = MultiObject([Job(d) for d in durations]).with_workers(2, cost_key=lambda job: job.duration)
+    started = []
+    assert jobs.run().L == durations  # the method comes from an attribute access
+    assert .3 in started[:2]
+
+    first = jobs.L[0]
+    started = []
+    assert jobs.filter(lambda job: job is not first).run().L == durations[1:]  # costs follow the filtered items
+    assert .3 in started[:2]
+
+
+def test_futures_stats():
+    from easypy.concurrency import concurrent_map, asynchronous
+
+    reports = []
+    durations = [.01] * 18 + [.2, .2]
+    assert concurrent_map(sleep, durations, workers=4, progress=reports.append) == [None] * 20
+    stats = reports[-1]
+    assert (stats.total, stats.completed, stats.running, stats.eta) == (20, 20, 0, 0)
+    assert .01 <= stats.p50 < .2 <= stats.p99
+    assert stats.throughput > 10
+    assert str(stats).startswith("20/20 done (0 running)")
+
+    with asynchronous(sleep, [.01, .3], final_timeout=5) as futures:
+        sleep(.1)
+        stats = futures.stats()
+        assert (stats.completed, stats.running) == (1, 1)
+        assert stats.eta > 0
+
+
+def test_rate_limit():
+    from easypy.concurrency import concurrent_map
+    from easypy.sync import RateLimiter, get_rate_limiter
+
+    timer = Timer()
+    assert concurrent_map(abs, range(-5, 5), rate=50) == [abs(n) for n in range(-5, 5)]
+    assert .15 <= timer.stop() < .5  # the first call doesn't wait
+
+    timer = Timer()
+    concurrent_map(abs, range(10), rate=50, burst=10)
+    assert timer.stop() < .1
+
+    with pytest.raises(KeyError):
+        get_rate_limiter("test_rate_limit")
+    limiter = get_rate_limiter("test_rate_limit", rate=100)
+    assert get_rate_limiter("test_rate_limit") is limiter
+
+    def call_twice(n):  # nested, so running on dedicated threads
+        return MultiObject([n, n]).with_rate_limit("test_rate_limit").call(abs).T
+
+    timer = Timer()
+    assert MultiObject(range(10)).with_rate_limit(limiter).call(call_twice).T == tuple((n, n) for n in range(10))
+    assert .25 <= timer.stop() < .6  # 30 calls, all on the same limiter
+
+    class Server(object):
+        def get_status(self):
+            return "ok"
+
+    servers = MultiObject([Server() for _ in range(6)]).with_rate_limit(20)
+    timer = Timer()
+    assert servers.get_status().T == ("ok",) * 6  # the method comes from an attribute access
+    assert .2 <= timer.stop() < .5
+
+    limiter = RateLimiter(rate=1)
+    limiter.acquire()
+    assert limiter.try_acquire() > .9
+
+
+def test_rate_limit_threads(monkeypatch):
+    import threading
+    from easypy.concurrency import concurrent_map, MAX_THREAD_POOL_SIZE
+
+    started = []
+    thread_start = threading.Thread.start
+    monkeypatch.setattr(threading.Thread, 'start', lambda thread: started.append(thread) or thread_start(thread))
+    assert concurrent_map(abs, range(200), rate=500) == list(range(200))
+    assert len(started) <= MAX_THREAD_POOL_SIZE + 1  # the waits don't start threads of their own
+
+
+def test_adaptive_workers():
+    from threading import Lock
+    from easypy.concurrency import concurrent_map, AdaptiveLimit
+
+    limit = AdaptiveLimit(initial=2, max_limit=10)
+    for latency in [.01] * 2 + [.01] * 3:
+        limit.add(latency)
+    assert limit.limit == 4
+    for latency in [.01, .01, .01, .1]:  # p95 latency went up
+        limit.add(latency)
+    assert limit.limit == 2
+    limit.add(.01, failed=True)
+    limit.add(.01)
+    assert limit.limit == 1
+
+    limit = AdaptiveLimit(initial=8, max_limit=10)
+    for _ in range(8):
+        limit.add(.01)
+    assert limit.limit == 9
+    limits = []
+    for _ in range(100):  # the latency steps up, and stays there
+        limit.add(.1)
+        limits.append(limit.limit)
+    assert min(limits) < 9
+    assert limit.limit == 10  # grows again, once the baseline caught up
+
+    lock = Lock()
+    in_flight = []
+    max_in_flight = []
+
+    def call(n):  # a backend that slows down with more than 4 calls in flight
+        with lock:
+            in_flight.append(n)
+            max_in_flight.append(len(in_flight))
+            latency = .005 * max(1, 4 * (len(in_flight) - 3))
+        sleep(latency)
+        with lock:
+            in_flight.remove(n)
+        return n
+
+    assert concurrent_map(call, range(150), workers="adaptive") == list(range(150))
+    assert 4 <= max(max_in_flight) <= 10
+    assert MultiObject(range(30)).with_workers("adaptive").call(call).T == tuple(range(30))
+
+
+def test_multiexception_summary():
+    from easypy.concurrency import concurrent_map
+
+    def fail(n):
+        if n % 3 == 0:
+            raise KeyError(n)
+        if n % 3 == 1:
+            raise ValueError(n)
+        return n
+
+    with pytest.raises(MultiException[Exception]) as info:
+        concurrent_map(fail, range(30))
+    exc = info.value
+    assert (exc.count, exc.invocations_count) == (20, 30)
+    assert exc.one.args == (0,)
+    assert [e.args[0] for e in exc.actual] == [n for n in range(30) if n % 3 != 2]
+
+    summary = exc.render(color=False)
+    assert "KeyError (x10)" in summary
+    assert "ValueError (x10)" in summary
+    assert "...and 9 more like it: 3, 6, 9, 12, 15, ..." in summary
+    assert summary.count("Traceback:") == 2
+
+    full = exc.render(color=False, full=True)
+    assert full.count("Traceback:") == 20
+
+
+def test_multiexception_render_texceptions():
+    from easypy.concurrency import concurrent_map
+    from easypy.exceptions import TException
+
+    class Failed(TException):
+        template = "failed on {n}"
+
+    def fail(n):
+        raise Failed(n=n)
+
+    with pytest.raises(MultiException[Failed]) as info:
+        concurrent_map(fail, range(3), workers=3)
+    assert "Failed (x3)" in str(info.value)
+    assert "failed on 0" in info.value.render(full=True)
+
+    exc = MultiException([ValueError(1), ValueError(2), None], [None] * 3)
+    summary = exc.render(color=False)
+    assert "...and 1 more like it" in summary
+    assert "like it:" not in summary